@@ -0,0 +1,54 @@
+import os
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+# Requests the scraper never needs. Images stay on unless browser.block_images is set: the operator
+# prompt, the broker screenshot and OCR all read the CAPTCHA image, and whisper falls back to them.
+LEAN_BLOCKED_URLS = [
+    "*.css", "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*google-analytics.com*", "*googletagmanager.com*",
+]
+IMAGE_URLS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.ico", "*.webp"]
+
+
+def build_options(cfg, profile_name=None):
+    options = Options()
+    browser_cfg = cfg.get("browser", {})
+    if browser_cfg.get("suppress_logs"):
+        options.add_argument("--log-level=3")
+    if browser_cfg.get("headless"):
+        options.add_argument("--headless")
+
+    if browser_cfg.get("profile") == "lean":
+        # don't wait for images/stylesheets before driver.get returns
+        options.page_load_strategy = "eager"
+        for arg in ("--disable-extensions", "--disable-component-extensions-with-background-pages",
+                    "--no-first-run", "--no-default-browser-check", "--disable-background-networking",
+                    "--disable-sync", "--mute-audio"):
+            options.add_argument(arg)
+        if browser_cfg.get("block_images", False):
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+
+        # one on-disk profile + cache per worker, Chrome refuses to share a profile directory
+        profile_root = os.path.abspath(browser_cfg.get("profile_dir") or os.path.join(cfg.get("output_dir", "output"), "browser_profiles"))
+        profile_dir = os.path.join(profile_root, profile_name or "default")
+        os.makedirs(profile_dir, exist_ok=True)
+        options.add_argument(f"--user-data-dir={profile_dir}")
+        options.add_argument(f"--disk-cache-dir={os.path.join(profile_dir, 'cache')}")
+    return options
+
+
+def block_requests(driver, cfg):
+    browser_cfg = cfg.get("browser", {})
+    patterns = list(browser_cfg.get("blocked_urls", LEAN_BLOCKED_URLS))
+    if browser_cfg.get("block_images", False):
+        patterns += IMAGE_URLS
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+
+
+def build_driver(cfg, profile_name=None):
+    driver = webdriver.Chrome(options=build_options(cfg, profile_name))
+    if cfg.get("browser", {}).get("profile") == "lean":
+        block_requests(driver, cfg)
+    return driver
@@ -0,0 +1,150 @@
+import base64, html, itertools, queue, threading, time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from app.logger import get_global_logger
+
+logger = get_global_logger()
+
+
+class CaptchaChallenge:
+    def __init__(self, challenge_id, label, worker, image_png=None):
+        self.id = challenge_id
+        self.label = label
+        self.worker = worker
+        self.image_png = image_png
+        self.created = time.time()
+        self.future = Future()
+
+    def title(self):
+        return f"#{self.id} [{self.worker}] {self.label}"
+
+
+class CaptchaBroker:
+    # Collects CAPTCHAs from every worker browser and hands the operator's answers back.
+    # Answers can come from the terminal, the local web page, or both.
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._open = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._server = None
+        self._stopped = threading.Event()
+
+    @classmethod
+    def from_config(cls, broker_cfg: dict):
+        broker_cfg = broker_cfg or {}
+        broker = cls()
+        if broker_cfg.get("console", True):
+            broker.serve_console()
+        if broker_cfg.get("web_port"):
+            broker.serve_web(broker_cfg.get("web_host", "127.0.0.1"), broker_cfg["web_port"])
+        return broker
+
+    def submit(self, label, image_png=None) -> Future:
+        # Non-blocking: the worker keeps the Future and waits on it only when it needs the answer.
+        challenge = CaptchaChallenge(next(self._ids), label, threading.current_thread().name, image_png)
+        with self._lock:
+            self._open[challenge.id] = challenge
+        self._queue.put(challenge)
+        logger.info(f"Queued CAPTCHA {challenge.title()} ({self._queue.qsize()} waiting).")
+        return challenge.future
+
+    def answer(self, challenge_id: int, text: str) -> bool:
+        with self._lock:
+            challenge = self._open.pop(challenge_id, None)
+        if challenge is None or challenge.future.done():
+            return False
+        challenge.future.set_result(text.strip())
+        logger.info(f"Answered CAPTCHA #{challenge_id} after {time.time() - challenge.created:.1f}s.")
+        return True
+
+    def pending(self):
+        with self._lock:
+            return sorted(self._open.values(), key=lambda c: c.id)
+
+    # ----------------------------
+    # Terminal front-end
+    # ----------------------------
+    def serve_console(self):
+        threading.Thread(target=self._console_loop, name="captcha-console", daemon=True).start()
+
+    def _console_loop(self):
+        while not self._stopped.is_set():
+            try:
+                challenge = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if challenge.future.done():
+                continue  # already answered from the web page
+
+            text = input(f"{challenge.title()} - Enter the Captcha seen (blank to skip): ").strip()
+            if not text:
+                self._queue.put(challenge)  # operator skipped it, ask again later
+                continue
+            if not self.answer(challenge.id, text):
+                print(f"CAPTCHA #{challenge.id} was already answered.")
+
+    # ----------------------------
+    # Local web front-end
+    # ----------------------------
+    def serve_web(self, host="127.0.0.1", port=8765):
+        broker = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self._send(200, broker._render_page())
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                form = parse_qs(self.rfile.read(length).decode("utf-8"))
+                try:
+                    broker.answer(int(form["id"][0]), form.get("answer", [""])[0])
+                except (KeyError, ValueError):
+                    pass
+                self.send_response(303)
+                self.send_header("Location", "/")
+                self.end_headers()
+
+            def _send(self, status, body):
+                payload = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="captcha-web", daemon=True).start()
+        logger.info(f"CAPTCHA page at http://{host}:{port}/")
+
+    def _render_page(self):
+        items = []
+        for challenge in self.pending():
+            image = ""
+            if challenge.image_png:
+                encoded = base64.b64encode(challenge.image_png).decode("ascii")
+                image = f'<img src="data:image/png;base64,{encoded}">'
+            items.append(
+                f'<form method="post"><p>{html.escape(challenge.title())}</p>{image}'
+                f'<input type="hidden" name="id" value="{challenge.id}">'
+                f'<input name="answer" autocomplete="off" {"autofocus" if not items else ""}>'
+                f'<button>Send</button></form>'
+            )
+        body = "".join(items) or "<p>No CAPTCHAs waiting.</p>"
+        return (f'<html><head><meta http-equiv="refresh" content="{3 if not items else 30}">'
+                f'<title>CAPTCHAs ({len(items)})</title></head><body>{body}</body></html>')
+
+    def stop(self):
+        self._stopped.set()
+        if self._server is not None:
+            self._server.shutdown()
+        with self._lock:
+            leftovers, self._open = list(self._open.values()), {}
+        for challenge in leftovers:
+            challenge.future.cancel()
@@ -1,86 +1,211 @@
-# import os, requests, re
-# from pydub import AudioSegment
-# from pydub.effects import normalize
-# import speech_recognition as sr
-# import whisper #type:ignore
-# import certifi
-# from app.logger import get_global_logger
-# from app.constant import CAPTCHA_MP3_PATH, FFMPEG_PATH, CAPTCHA_WAV_PATH
-
-# logger = get_global_logger()
-
-# def recognize_audio(driver, url):
-#     session = requests.Session()
-#     for cookie in driver.get_cookies():
-#         session.cookies.set(cookie['name'], cookie['value'])
-#         print(f"{cookie["name"],{cookie["value"]}}")
-
-#     os.environ["PATH"] += os.pathsep + FFMPEG_PATH
-#     # response = session.get(url, verify=False)
-#     try:
-#         response = session.get(url, verify=False)
-#         logger.warning("Falling back to unverified SSL request.")
-#         logger.info(f"Audio fetch status: {response.status_code}")
-#     except Exception as e:
-#         logger.error(f"Fallback failed: {e}")
-#         return None
-
-#     logger.info(f"Audio fetch status: {response.status_code}")
-#     with open(CAPTCHA_MP3_PATH, "wb") as f:
-#         f.write(response.content)
-
-#     # preprocess
-#     # preprocess_audio(CAPTCHA_MP3_PATH, CAPTCHA_WAV_PATH)
-
-#     logger.info("Beginning to detect audio...")
-#     model = whisper.load_model("small.en")  # improved model
-#     result = model.transcribe(CAPTCHA_MP3_PATH,language="en",initial_prompt="The audio contains only letters and numbers.")
-
-#     data = result["text"]
-#     correct_data = "".join(c for c in data if c.isalnum()).upper()
-#     logger.info(f"Language: {result['language']}  |  Transcription: {correct_data}")
-#     return correct_data
-
-
-# def recognize_audio(driver,url):
-    
-#     #create session
-#     session = requests.Session()
-#     for cookie in driver.get_cookies():
-#         session.cookies.set(cookie['name'], cookie['value'])
-    
-#     response = session.get(url)
-#     with open(CAPTCHA_MP3_PATH, "wb") as f:
-#         f.write(response.content)
-#     logger.info(f"Beginning to detect audio...")
-#     model = whisper.load_model("base")
-#     result = model.transcribe(CAPTCHA_MP3_PATH) #detect value
-#     data = result["text"]
-    
-#     matches = re.findall(r"[A-Za-z0-9]+",data,re.IGNORECASE)
-#     correct_data = "".join(matches).upper()
-#     logger.info(f"Detected language:{result["language"]}\tTranscription:{correct_data}")
-#     return correct_data
-
-        
-# def download_audio(session, url):
-#     response = session.get(url)
-#     with open(CAPTCHA_MP3_PATH, "wb") as f:
-#         f.write(response.content)
-
-#     os.environ["PATH"] += os.pathsep + FFMPEG_PATH
-#     sound = AudioSegment.from_file(CAPTCHA_MP3_PATH, format="mp3")
-#     sound = sound.set_channels(1).set_frame_rate(16000)
-#     sound = normalize(sound)
-#     sound = sound.strip_silence(silence_len=300, silence_thresh=-40)
-#     sound.export(CAPTCHA_WAV_PATH, format="wav")
-#     return CAPTCHA_WAV_PATH
-
-# def recognize_audio(wav_path):
-#     recognizer = sr.Recognizer()
-#     with sr.AudioFile(wav_path) as source:
-#         audio_data = recognizer.record(source)
-#     try:
-#         return recognizer.recognize_google(audio_data).upper().replace(" ", "")
-#     except:
-#         return ""
+import io, itertools, math, queue, re, threading, time
+import multiprocessing as mp
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from app.http_pager import session_from_driver
+from app.logger import get_global_logger
+
+logger = get_global_logger()
+
+SAMPLE_RATE = 16000
+CAPTCHA_PROMPT = "The audio contains only letters and numbers."
+_NON_ALNUM = re.compile(r"[^A-Za-z0-9]+")
+
+
+def fetch_captcha_audio(driver, url, verify=True) -> bytes:
+    # the audio is tied to the browser's session, so reuse its cookies; nothing touches the disk
+    session = session_from_driver(driver, pool_size=1)
+    try:
+        response = session.get(url, verify=verify, timeout=10)
+        response.raise_for_status()
+        logger.info(f"Audio fetch status: {response.status_code} ({len(response.content)} bytes)")
+        return response.content
+    finally:
+        session.close()
+
+
+def decode_audio(audio_bytes: bytes):
+    # mp3/wav bytes -> mono float32 at 16 kHz, decoded in-process (no ffmpeg subprocess)
+    import numpy as np
+    import soundfile as sf
+
+    data, rate = sf.read(io.BytesIO(audio_bytes), dtype="float32", always_2d=True)
+    audio = data.mean(axis=1)
+    if rate != SAMPLE_RATE:
+        target_len = int(round(len(audio) * SAMPLE_RATE / rate))
+        positions = np.linspace(0, len(audio), target_len, endpoint=False)
+        audio = np.interp(positions, np.arange(len(audio)), audio)
+    return audio.astype(np.float32)
+
+
+def clean_transcription(text: str) -> str:
+    # words stay separated so spelled-out characters can be mapped (captcha_voting.normalize_spoken)
+    return " ".join(_NON_ALNUM.split(text or "")).strip().upper()
+
+
+def _collect_batch(requests_q, batch_size, batch_window):
+    # Blocks for the first request, then gathers whatever else arrives within batch_window.
+    first = requests_q.get()
+    if first is None:
+        return [], True
+
+    batch, stop = [first], False
+    deadline = time.monotonic() + batch_window
+    while len(batch) < batch_size:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            item = requests_q.get(timeout=remaining)
+        except queue.Empty:
+            break
+        if item is None:
+            stop = True
+            break
+        batch.append(item)
+    return batch, stop
+
+
+def _transcribe_batch(model, whisper, batch):
+    import torch
+
+    mels, answers = [], {}
+    for request_id, audio_bytes in batch:
+        try:
+            audio = whisper.pad_or_trim(torch.from_numpy(decode_audio(audio_bytes)))
+            mels.append((request_id, whisper.log_mel_spectrogram(audio, n_mels=model.dims.n_mels)))
+        except Exception as e:
+            answers[request_id] = ("", 0.0, f"Could not decode audio: {e}")
+
+    if mels:
+        options = whisper.DecodingOptions(
+            language="en", prompt=CAPTCHA_PROMPT, without_timestamps=True,
+            fp16=model.device.type == "cuda",
+        )
+        mel_batch = torch.stack([mel for _, mel in mels]).to(model.device)
+        for (request_id, _), result in zip(mels, whisper.decode(model, mel_batch, options)):
+            confidence = math.exp(result.avg_logprob) * (1.0 - result.no_speech_prob)
+            answers[request_id] = (clean_transcription(result.text), round(confidence, 3), None)
+    return answers
+
+
+def _solver_main(model_name, requests_q, responses_q, batch_size, batch_window):
+    # Runs in the solver process: load the model once, then serve batches until the None sentinel.
+    # A model that cannot be loaded is reported with a request id of None and the process exits.
+    try:
+        import whisper #type:ignore
+        model = whisper.load_model(model_name)
+    except Exception as e:
+        responses_q.put((None, "", 0.0, f"Could not load whisper model '{model_name}': {e}"))
+        return
+    stop = False
+    while not stop:
+        batch, stop = _collect_batch(requests_q, batch_size, batch_window)
+        if not batch:
+            continue
+        try:
+            answers = _transcribe_batch(model, whisper, batch)
+        except Exception as e:
+            answers = {request_id: ("", 0.0, str(e)) for request_id, _ in batch}
+        for request_id, answer in answers.items():
+            responses_q.put((request_id, *answer))
+    responses_q.put(None)
+
+
+class CaptchaSolverService:
+    # Resident whisper process shared by every worker browser; solve() is thread-safe.
+
+    def __init__(self, model_name="small.en", batch_size=8, batch_window=0.2):
+        ctx = mp.get_context("spawn")
+        self._requests = ctx.Queue()
+        self._responses = ctx.Queue()
+        self._process = ctx.Process(
+            target=_solver_main, name="captcha-solver", daemon=True,
+            args=(model_name, self._requests, self._responses, batch_size, batch_window),
+        )
+        self._dispatcher = threading.Thread(target=self._dispatch, name="captcha-dispatch", daemon=True)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._failure = None
+
+    @classmethod
+    def from_config(cls, captcha_cfg: dict):
+        if (captcha_cfg or {}).get("solver") != "whisper":
+            return None
+        return cls(
+            model_name=captcha_cfg.get("model", "small.en"),
+            batch_size=captcha_cfg.get("batch_size", 8),
+            batch_window=captcha_cfg.get("batch_window", 0.2),
+        )
+
+    def start(self):
+        self._process.start()
+        self._dispatcher.start()
+        logger.info(f"CAPTCHA solver started (pid {self._process.pid}).")
+        return self
+
+    def alive(self) -> bool:
+        return self._failure is None and self._process.is_alive()
+
+    def _check_alive(self):
+        if self._failure is None and not self._process.is_alive():
+            self._failure = f"solver process exited (code {self._process.exitcode})"
+        if self._failure is not None:
+            raise RuntimeError(f"CAPTCHA solver is not running: {self._failure}")
+
+    def solve(self, audio_bytes: bytes, timeout=120, poll_interval=1.0):
+        # Returns (answer, confidence); ("", 0.0) when the audio could not be transcribed.
+        # Raises RuntimeError right away once the solver process is gone, instead of waiting
+        # out the timeout on every CAPTCHA.
+        self._check_alive()
+        future = Future()
+        with self._lock:
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+        self._requests.put((request_id, audio_bytes))
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                try:
+                    return future.result(timeout=min(poll_interval, max(0.0, deadline - time.monotonic())))
+                except FutureTimeout:
+                    self._check_alive()
+                    if time.monotonic() >= deadline:
+                        logger.warning(f"CAPTCHA solver gave no answer within {timeout}s.")
+                        return "", 0.0
+        finally:
+            with self._lock:
+                self._pending.pop(request_id, None)
+
+    def _dispatch(self):
+        while True:
+            item = self._responses.get()
+            if item is None:
+                break
+            request_id, text, confidence, error = item
+            if request_id is None:
+                self._fail(error)
+                break
+            if error:
+                logger.warning(f"CAPTCHA solver error: {error}")
+            with self._lock:
+                future = self._pending.get(request_id)
+            if future is not None:
+                future.set_result((text, confidence))
+
+    def _fail(self, error):
+        # the model never loaded: every waiting solve() gives up now, later ones raise at once
+        logger.error(f"CAPTCHA solver failed, falling back to manual entry: {error}")
+        self._failure = error
+        with self._lock:
+            pending = list(self._pending.values())
+        for future in pending:
+            future.set_exception(RuntimeError(f"CAPTCHA solver is not running: {error}"))
+
+    def stop(self):
+        self._requests.put(None)
+        self._process.join(timeout=10)
+        if self._process.is_alive():
+            self._process.terminate()
+        logger.info("CAPTCHA solver stopped.")
@@ -0,0 +1,226 @@
+import io, re, threading
+
+from app.logger import get_global_logger
+
+logger = get_global_logger()
+
+DEFAULT_CHARSET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+
+# what whisper writes for a spoken character, and what OCR confuses across a restricted charset
+_SPOKEN = {"ZERO": "0", "OH": "0", "ONE": "1", "TWO": "2", "TO": "2", "TOO": "2", "THREE": "3", "FOUR": "4",
+           "FOR": "4", "FIVE": "5", "SIX": "6", "SEVEN": "7", "EIGHT": "8", "NINE": "9",
+           "BE": "B", "BEE": "B", "SEE": "C", "SEA": "C", "DEE": "D", "GEE": "G", "JAY": "J", "KAY": "K",
+           "PEE": "P", "QUEUE": "Q", "CUE": "Q", "ARE": "R", "TEA": "T", "TEE": "T", "YOU": "U", "WHY": "Y",
+           "EX": "X", "ZED": "Z", "ZEE": "Z", "DOUBLEU": "W"}
+_LOOKALIKES = {"O": "0Q", "0": "OQ", "Q": "O0", "I": "1L", "1": "IL", "L": "1I", "S": "5", "5": "S",
+               "B": "8", "8": "B", "Z": "2", "2": "Z", "G": "6", "6": "G", "U": "V", "V": "U"}
+_NON_ALNUM = re.compile(r"[^A-Z0-9]+")
+
+# each look-alike substitution costs this much of the reading's confidence
+_SUBSTITUTION_PENALTY = 0.7
+
+
+class CaptchaConstraints:
+    # What an answer on the tribunal form can look like: a fixed charset and a length range.
+
+    def __init__(self, charset=DEFAULT_CHARSET, min_length=4, max_length=8, case_sensitive=False):
+        self.case_sensitive = case_sensitive
+        self.charset = set(charset if case_sensitive else charset.upper())
+        self.min_length = min_length
+        self.max_length = max_length
+
+    @classmethod
+    def from_config(cls, captcha_cfg: dict):
+        length = captcha_cfg.get("length", [4, 8])
+        if isinstance(length, int):
+            length = [length, length]
+        return cls(captcha_cfg.get("charset", DEFAULT_CHARSET), length[0], length[1],
+                   captcha_cfg.get("case_sensitive", False))
+
+    def allowed(self, text: str) -> bool:
+        return self.min_length <= len(text) <= self.max_length and all(c in self.charset for c in text)
+
+    def variants(self, text: str) -> list:
+        # [(answer, penalty)]: the reading itself when it fits, else every way of swapping its
+        # out-of-charset characters for a look-alike that is in the charset
+        text = text if self.case_sensitive else text.upper()
+        options = []
+        for char in text:
+            if char in self.charset:
+                options.append([(char, 1.0)])
+                continue
+            swaps = [(alt, _SUBSTITUTION_PENALTY) for alt in _LOOKALIKES.get(char.upper(), "") if alt in self.charset]
+            if not swaps:
+                return []
+            options.append(swaps)
+        variants = [("", 1.0)]
+        for choices in options:
+            variants = [(prefix + char, penalty * p) for prefix, penalty in variants for char, p in choices]
+            if len(variants) > 64:
+                return []  # too garbled to be worth a vote
+        return [(answer, penalty) for answer, penalty in variants if self.allowed(answer)]
+
+    def alternatives(self, text: str) -> list:
+        # variants() plus every single look-alike swap of them, so two sources that disagree on
+        # one ambiguous character (0/O, 8/B) still add up on the same answer
+        variants = self.variants(text)
+        seen = {answer for answer, _ in variants}
+        for answer, penalty in list(variants):
+            for i, char in enumerate(answer):
+                for alt in _LOOKALIKES.get(char, ""):
+                    swapped = answer[:i] + alt + answer[i + 1:]
+                    if alt in self.charset and swapped not in seen:
+                        seen.add(swapped)
+                        variants.append((swapped, penalty * _SUBSTITUTION_PENALTY))
+        return variants
+
+
+def normalize_spoken(text: str) -> str:
+    # "seven B, eight oh" -> "7B80"; whisper spells some characters out as words. Only whole
+    # words are mapped, so a run like "BE4TO9" stays as written.
+    return "".join(_SPOKEN.get(word, word) for word in _NON_ALNUM.split((text or "").upper()))
+
+
+def _tesseract():
+    try:
+        import pytesseract
+        from PIL import Image, ImageOps
+    except ImportError as e:
+        raise ImportError("CAPTCHA OCR needs pytesseract, Pillow and the tesseract binary: "
+                          "pip install pytesseract pillow") from e
+    return pytesseract, Image, ImageOps
+
+
+def ocr_captcha(image_png: bytes, constraints: CaptchaConstraints):
+    # (text, confidence) from tesseract restricted to the charset, one text line
+    pytesseract, Image, ImageOps = _tesseract()
+    image = Image.open(io.BytesIO(image_png)).convert("L")
+    image = ImageOps.autocontrast(image.resize((image.width * 3, image.height * 3), Image.LANCZOS))
+    whitelist = "".join(sorted(constraints.charset))
+    data = pytesseract.image_to_data(image, config=f"--psm 7 -c tessedit_char_whitelist={whitelist}",
+                                     output_type=pytesseract.Output.DICT)
+    words = [(text, float(conf)) for text, conf in zip(data["text"], data["conf"])
+             if text.strip() and float(conf) >= 0]
+    if not words:
+        return "", 0.0
+    return "".join(text for text, _ in words), sum(conf for _, conf in words) / len(words) / 100
+
+
+class Candidate:
+    def __init__(self, text, score, sources):
+        self.text = text
+        self.score = score
+        self.sources = tuple(sources)
+
+    def __repr__(self):
+        return f"{self.text} ({self.score:.2f} from {'+'.join(self.sources)})"
+
+
+def rank_candidates(readings, constraints: CaptchaConstraints, weights=None) -> list:
+    # readings: [(source, text, confidence)]. Every reading votes for the answers it can stand
+    # for under the constraints; independent sources agreeing combine as 1 - prod(1 - c).
+    weights = weights or {}
+    evidence = {}
+    for source, text, confidence in readings:
+        if not text or confidence <= 0:
+            continue
+        confidence = min(1.0, confidence * weights.get(source, 1.0))
+        for answer, penalty in constraints.alternatives(text):
+            votes = evidence.setdefault(answer, {})
+            votes[source] = max(votes.get(source, 0.0), confidence * penalty)
+    candidates = []
+    for answer, votes in evidence.items():
+        miss = 1.0
+        for confidence in votes.values():
+            miss *= 1.0 - confidence
+        candidates.append(Candidate(answer, round(1.0 - miss, 4), sorted(votes)))
+    return sorted(candidates, key=lambda c: (-c.score, -len(c.sources), c.text))
+
+
+class CaptchaVoter:
+    # Turns the audio transcription and (optionally) an OCR pass on the image into ranked
+    # candidates; pick() only returns one worth a submit. The default threshold is the score band
+    # the site accepts almost every time (>= 0.8 in CaptchaStats' by_score); below it a wrong
+    # submit and its reload cost more than a refresh.
+
+    def __init__(self, constraints=None, threshold=0.8, ocr=False, weights=None, max_refreshes=2):
+        self.constraints = constraints or CaptchaConstraints()
+        self.threshold = threshold
+        self.ocr = ocr
+        self.weights = weights or {}
+        self.max_refreshes = max_refreshes
+        if ocr:
+            _tesseract()
+
+    @classmethod
+    def from_config(cls, captcha_cfg: dict):
+        captcha_cfg = captcha_cfg or {}
+        return cls(CaptchaConstraints.from_config(captcha_cfg),
+                   threshold=captcha_cfg.get("min_confidence", 0.8),
+                   ocr=captcha_cfg.get("ocr", False),
+                   weights=captcha_cfg.get("weights"),
+                   max_refreshes=captcha_cfg.get("max_refreshes", 2))
+
+    def candidates(self, audio=None, image_png=None) -> list:
+        # audio: (text, confidence) from the solver
+        readings = []
+        if audio is not None and audio[0]:
+            readings.append(("audio", normalize_spoken(audio[0]), audio[1]))
+        if self.ocr and image_png:
+            try:
+                readings.append(("ocr", *ocr_captcha(image_png, self.constraints)))
+            except Exception as e:
+                logger.warning(f"CAPTCHA OCR failed: {e}")
+        return rank_candidates(readings, self.constraints, self.weights)
+
+    def pick(self, candidates):
+        if candidates and candidates[0].score >= self.threshold:
+            return candidates[0]
+        return None
+
+
+class CaptchaStats:
+    # Acceptance of submitted answers by source and by score band, plus submits per job, so the
+    # threshold can be tuned against what the site actually accepts.
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.by_source = {}
+        self.by_score = {}
+        self.refreshes = 0
+        self.jobs = 0
+        self.job_submits = 0
+
+    def record(self, candidate: Candidate, accepted: bool):
+        tables = [(self.by_source, "+".join(candidate.sources))]
+        if "manual" not in candidate.sources:
+            tables.append((self.by_score, f"{min(int(candidate.score * 10), 9) / 10:.1f}"))
+        with self._lock:
+            for table, key in tables:
+                counts = table.setdefault(key, [0, 0])
+                counts[0] += 1
+                counts[1] += bool(accepted)
+
+    def record_refresh(self):
+        with self._lock:
+            self.refreshes += 1
+
+    def record_job(self, submits: int):
+        with self._lock:
+            self.jobs += 1
+            self.job_submits += submits
+
+    def summary(self) -> dict:
+        with self._lock:
+            submitted = sum(n for n, _ in self.by_source.values())
+            accepted = sum(ok for _, ok in self.by_source.values())
+            rate = lambda table: {key: f"{ok}/{n} ({ok / n:.0%})" for key, (n, ok) in sorted(table.items())}
+            return {
+                "submitted": submitted,
+                "accepted": accepted,
+                "acceptance": round(accepted / submitted, 3) if submitted else None,
+                "submits_per_job": round(self.job_submits / self.jobs, 2) if self.jobs else None,
+                "refreshes": self.refreshes,
+                "by_source": rate(self.by_source),
+                "by_score": rate(self.by_score),
+            }
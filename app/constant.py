@@ -1,5 +1,5 @@
 from datetime import datetime
-import json, json5, os
+import json, os
 
 root_dir = os.path.join(os.path.dirname(__file__),"..")
 
@@ -14,30 +14,133 @@ def load_json(path: str):
         return json.load(f)
 
 def load_json5(path: str):
+    import json5
     with open(path, "r", encoding="utf-8") as f:
         return json5.load(f)
 
 
-CONFIG = load_json5(os.path.join(root_dir,"configs.json5"))
+CONFIG_PATH = os.path.join(root_dir,"configs.json5")
+_config = None
 
-TODAY = datetime.now().strftime("%Y-%m-%d")
+def load_config(path: str = None) -> dict:
+    # configs.json5 (or `path`) is parsed on first use, not on import; later calls share the dict
+    global _config, CONFIG_PATH
+    if path is not None and path != CONFIG_PATH:
+        CONFIG_PATH, _config = path, None
+    if _config is None:
+        _config = load_json5(CONFIG_PATH)
+    return _config
 
-WEBSITE_URL = CONFIG.get("url", "https://itat.gov.in/judicial/tribunalorders")
-INPUT_PATH = CONFIG.get("input_path", os.path.dirname(__file__))
-OUTPUT_DIR = CONFIG.get("output_dir", "output")
-LOG_DIR = create_dir(OUTPUT_DIR,"logs",TODAY)
-# DATA_DIR = create_dir(OUTPUT_DIR)
+def get_output_dir() -> str:
+    return load_config().get("output_dir", "output")
+
+def get_log_dir(day: str = None) -> str:
+    # logs/<day>/, today's unless given; looked up per day so a long-running process moves on
+    # to the next directory at midnight. Created when something actually logs to a file.
+    return create_dir(get_output_dir(), "logs", day or datetime.now().strftime("%Y-%m-%d"))
+
+_LAZY = {
+    "CONFIG": load_config,
+    "OUTPUT_DIR": get_output_dir,
+    "LOG_DIR": get_log_dir,
+    "INPUT_PATH": lambda: load_config().get("input_path", os.path.dirname(__file__)),
+}
+
+def __getattr__(name):
+    # `from app.constant import CONFIG` keeps working, it just loads the config at that point
+    if name in _LAZY:
+        return _LAZY[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # CONFIG = {
 #     "url": "https://itat.gov.in/judicial/tribunalorders",
-#     "benches": [20],        # can be list [20,21,22] or range via start..end
-#     "appeals": [1, 2, 3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18],   # same as above
-#     "dates": ["28/09/2025"], # allow multiple or a range
+#     "benches": [20],        # list of indexes or names from bench_values, "start..end" ranges, or "all"
+#     "appeals": [1, 2, 3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18],   # same as above, e.g. ["1..18"]
+#     "dates": ["28/09/2025"], # allow multiple or a range "01/09/2025..05/09/2025"
+#     "reuse_form": True,     # keep the search form between jobs instead of reloading the page
 #     "max_attempts": 5,
+#     "resume": True,         # skip jobs output/jobs.sqlite3 already marks done/empty
+#     "yield": {              # order jobs by the hit rate of their bench/appeal in output/jobs.sqlite3
+#         "full_sweep": False,    # True runs every job in plain date/bench/appeal order
+#         "low_yield": "defer",   # "defer" runs near-always-empty pairs last, "skip" leaves them out
+#         "skip_below": 0.05,     # hit rate that counts as near-always-empty...
+#         "min_runs": 5           # ...once the pair has been tried at least this often
+#     },
+#     "order_index": True,    # remember every order link in output/orders.sqlite3 and write *_delta.xlsx with new ones
+#     "sink": "csv",          # csv | parquet -> output/dataset/date=.../bench=..., excel -> legacy per-job xlsx
+#     "enrich_parties": False, # --export adds Appellant/Respondent, canonical names/keys and Revenue flags
+#     "timing": False,        # write per-phase spans to logs/<today>/spans.jsonl and print p50/p95 at the end
+#     "workers": 1,           # number of parallel browsers, each with its own scraper
+#     "submit_timeout": 10,   # max seconds to wait for either the wrong-CAPTCHA alert or the results
+#     "captcha": {            # "whisper" runs a resident offline solver; anything else means manual entry
+#         "solver": "manual",
+#         "model": "small.en",
+#         "min_confidence": 0.8,  # best candidate's score needed to submit; below it the CAPTCHA is refreshed
+#         "max_refreshes": 2,     # fresh CAPTCHAs to try before the operator is asked instead
+#         "charset": "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789",
+#         "length": [4, 8],       # min/max characters, or one number
+#         "ocr": False,           # also read the image with tesseract (pytesseract + pillow)
+#         "weights": {"audio": 1.0, "ocr": 0.8},  # scale each source's confidence before voting
+#         "batch_size": 8,
+#         "batch_window": 0.2,
+#         "broker": {         # where the operator answers: this terminal and/or http://127.0.0.1:<web_port>/
+#             "console": True,
+#             "web_port": 8765
+#         }
+#     },
+#     "pagination": {         # "browser" clicks btnPage, "http" fetches pages 2..n with the browser's cookies
+#         "mode": "browser",
+#         "concurrency": 1,
+#         "verify_ssl": True
+#     },
+#     "downloads": {          # python main.py download DD/MM/YYYY -> output/<ddmmyyyy>_DATA/orders/
+#         "workers": 8,
+#         "rate_per_host": 4.0,   # requests per second to one host, shared by all download threads
+#         "retries": 4,
+#         "backoff": 0.5,         # seconds, doubled on every retry
+#         "timeout": 30,
+#         "verify_ssl": True
+#     },
+#     "fulltext": {           # python main.py index [DD/MM/YYYY] / search "QUERY" -> output/fulltext.sqlite3
+#         "workers": None         # PDF text extraction processes, defaults to the CPU count
+#     },
+#     "daemon": {             # python main.py scrape --daemon: warm browsers, dates computed on every cycle
+#         "times": ["10:00", "19:00"],  # wall-clock schedule, or "interval_minutes": 120
+#         "dates": "recent",      # "recent" = the last days_back days and today, "backfill" = since the last finished date
+#         "days_back": 1,         # these recent dates are always scraped again for late uploads
+#         "max_backfill_days": 30,
+#         "run_on_start": True,
+#         "health_port": 8766     # GET http://127.0.0.1:8766/health -> JSON status
+#     },
+#     "supervisor": {         # per-worker browser health; memory needs the optional psutil package
+#         "recycle_after_jobs": 50,   # fresh Chrome after this many jobs
+#         "max_rss_mb": 1500,     # ...or when chromedriver + Chrome use more than this
+#         "ping_timeout": 10,     # seconds a WebDriver call may take before the browser counts as hung
+#         "max_requeues": 2       # a job whose browser died is retried on a fresh one this often
+#     },
+#     "page_cache": {         # raw result pages for python main.py replay [DD/MM/YYYY] -> output/replay/
+#         "enabled": False,
+#         "dir": None,            # defaults to output/page_cache
+#         "max_mb": 2048,         # least recently written pages are evicted past this
+#         "workers": None         # replay parser processes, defaults to the CPU count
+#     },
+#     "coordinator": {        # python main.py scrape --coordinator / scrape --worker http://<host>:8770
+#         "host": "127.0.0.1",    # "0.0.0.0" to accept workers from other machines
+#         "port": 8770,
+#         "lease_ttl": 120,       # seconds a worker may go silent before its job is handed to someone else
+#         "max_attempts": 3,      # failed jobs are leased again until this many tries
+#         "poll_interval": 5,     # seconds a worker waits before asking again while every job left is leased
+#         "shutdown_grace": None, # seconds the coordinator keeps telling workers "no jobs left" before it exits;
+#                                 # defaults to twice poll_interval
+#         "worker_id": None       # defaults to the machine's host name
+#     },
 #     "output_dir": "results",
 #     "browser": {
 #         "headless": False,
-#         "suppress_logs": True
+#         "suppress_logs": True,
+#         "profile": "default",   # "lean": eager page load, no extensions, blocked assets, per-worker profile + cache
+#         "block_images": False,  # lean only; True hides the CAPTCHA image from the operator, broker and OCR
+#         "profile_dir": None     # lean only; defaults to output/browser_profiles/<worker>
 #     }
 # }
 
@@ -48,6 +151,7 @@ DEFAULT_TODAY_DATE = datetime.today().strftime("%d/%m/%Y")
 WEBSITE_URL = r"https://itat.gov.in/judicial/tribunalorders"
 
 DEFAULT_WAIT_TIME = 10
+SUBMIT_POLL_INTERVAL = 0.1
 
 # SELENIUM WINDOW CONSTANTS
 WINDOW_WIDTH = 700
@@ -72,8 +176,54 @@ AUDIO_PLAY_BUTTON = "//img[@alt='Play Icon']"
 AUDIO_SOURCE = "captchaAudio"
 
 CAPTCHA_REFRESH =  "//img[@alt='Refresh Icon']"
+CAPTCHA_IMAGE = "//img[contains(@src, 'captcha') and not(@alt='Play Icon') and not(@alt='Refresh Icon')]"
 
 SUBMIT_CAPTCHA_BUTTON = "b2"
 CAPTCHA_ID =  "captcha"
 
-PAGE_BTN_XPATH = "//input[@name='btnPage']"
\ No newline at end of file
+PAGE_BTN_XPATH = "//input[@name='btnPage']"
+
+# Returns [[parties, order_link], ...] for every row of the results table in one call.
+# Mirrors the old per-row lookups: td:nth-child(2) text and td:nth-child(4) a href.
+EXTRACT_ROWS_JS = """
+return Array.from(document.querySelectorAll('#results table tbody tr')).map(function (tr) {
+    var parties = tr.querySelector('td:nth-child(2)');
+    var link = tr.querySelector('td:nth-child(4) a');
+    return [parties ? parties.innerText.trim() : null, link ? link.href : null];
+});
+"""
+
+# Markup of the results block, stored by the page cache and re-parsed by result_parser on replay.
+RESULTS_HTML_JS = """
+var results = document.querySelector('#results');
+return results ? results.outerHTML : null;
+"""
+
+# Snapshot of the form that owns the btnPage buttons, so later pages can be fetched over HTTP.
+PAGE_FORM_STATE_JS = """
+var btn = document.querySelector("input[name='btnPage']");
+if (!btn || !btn.form) { return null; }
+var form = btn.form, fields = [];
+Array.from(form.elements).forEach(function (el) {
+    if (!el.name || el.disabled) { return; }
+    if (['submit', 'button', 'image', 'reset', 'file'].indexOf(el.type) >= 0) { return; }
+    if ((el.type === 'checkbox' || el.type === 'radio') && !el.checked) { return; }
+    if (el.tagName === 'SELECT' && el.multiple) {
+        Array.from(el.selectedOptions).forEach(function (o) { fields.push([el.name, o.value]); });
+        return;
+    }
+    fields.push([el.name, el.value]);
+});
+return {action: form.action || location.href, method: (form.method || 'get').toLowerCase(), fields: fields};
+"""
+
+
+# Results table rendered by the latest submit (stale tables are tagged before submitting).
+MARK_RESULTS_STALE_JS = """
+document.querySelectorAll('#results table').forEach(function (t) { t.setAttribute('data-stale', '1'); });
+"""
+RESULTS_READY_JS = """
+return Array.from(document.querySelectorAll('#results table')).some(function (t) {
+    return !t.hasAttribute('data-stale') && t.querySelector('tbody tr') !== null;
+});
+"""
\ No newline at end of file
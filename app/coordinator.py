@@ -0,0 +1,424 @@
+import json, secrets, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.planner import shares_form_state
+from app.job_ledger import FINISHED_STATUSES
+from app.logger import get_global_logger
+
+logger = get_global_logger()
+
+# how far down the pending list a lease looks for a job that keeps the worker's bench and date
+_PREFERENCE_WINDOW = 200
+
+
+class Lease:
+    def __init__(self, job, worker, ttl):
+        self.token = secrets.token_hex(8)
+        self.job = job
+        self.worker = worker
+        self.expires = time.monotonic() + ttl
+        self.rows = 0
+        self.new_rows = 0
+        self.resumed = False
+        self.replaced = False
+        self.unindexed = []
+
+
+class Coordinator:
+    # Holds the job matrix for any number of worker processes. Jobs are leased for `ttl` seconds;
+    # a worker renews its leases while it works, pushes row batches per page and reports the
+    # result. Leases that lapse go back to the front of the queue. The JobLedger stays the
+    # durable record, so a restarted coordinator resumes from it.
+
+    def __init__(self, jobs, ledger, sink, delta_sink=None, order_index=None, ttl=120, max_attempts=3):
+        self.ledger = ledger
+        self.sink = sink
+        self.delta_sink = delta_sink
+        self.order_index = order_index
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+        self._pending = list(jobs)
+        self._leases = {}
+        self._attempts = {}
+        self._lock = threading.Lock()
+        self.finished = threading.Event()
+        if not self._pending:
+            self.finished.set()
+
+    def _expire(self):
+        now = time.monotonic()
+        for token, lease in list(self._leases.items()):
+            if lease.expires < now:
+                logger.warning(f"Lease on {lease.job} held by {lease.worker} expired.")
+                del self._leases[token]
+                self._pending.insert(0, lease.job)
+
+    def _lease_for(self, token):
+        lease = self._leases.get(token)
+        if lease is None:
+            raise KeyError(f"Unknown or expired lease {token}.")
+        return lease
+
+    def lease(self, worker, previous=None) -> dict:
+        with self._lock:
+            self._expire()
+            remaining = len(self._pending) + len(self._leases)
+            if not self._pending:
+                return {"job": None, "remaining": remaining}
+            index = next((i for i, job in enumerate(self._pending[:_PREFERENCE_WINDOW])
+                          if shares_form_state(previous, job)), 0)
+            job = self._pending.pop(index)
+            lease = Lease(job, worker, self.ttl)
+            self._leases[lease.token] = lease
+            self._attempts[job] = self._attempts.get(job, 0) + 1
+        self.ledger.mark_running(job, worker)
+        checkpoint = self.ledger.get(job) or {}
+        lease.resumed = checkpoint.get("last_page", 0) > 0
+        return {"job": list(job), "token": lease.token, "ttl": self.ttl, "remaining": remaining,
+                "attempts": self._attempts[job] - 1, "last_page": checkpoint.get("last_page", 0),
+                "rows": checkpoint.get("rows", 0)}
+
+    def renew(self, tokens) -> list:
+        # returns the tokens that are no longer valid; the worker should abandon those jobs
+        with self._lock:
+            self._expire()
+            expired = [token for token in tokens if token not in self._leases]
+            for token in tokens:
+                if token in self._leases:
+                    self._leases[token].expires = time.monotonic() + self.ttl
+        return expired
+
+    def push(self, token, page, rows, total_rows) -> dict:
+        with self._lock:
+            lease = self._lease_for(token)
+            lease.expires = time.monotonic() + self.ttl
+        job, order_date = lease.job, lease.job[2]
+        rows = [list(row) for row in rows]
+        if rows and not lease.resumed and not lease.replaced:
+            # the job starts over: drop what an earlier run of it wrote (see runner)
+            self.sink.reset_job(rows[0][0], rows[0][1], order_date)
+            if self.order_index is not None and not self.delta_sink.durable:
+                self.delta_sink.reset_job(rows[0][0], rows[0][1], order_date)
+            lease.replaced = True
+        self.sink.write_batch(rows, order_date)
+        if self.order_index is not None:
+            if self.delta_sink.durable:
+                new_rows = self.order_index.add_new(rows, order_date=order_date)
+            else:  # indexed in complete(), once the delta is written (see runner)
+                new_rows = self.order_index.unseen(rows)
+                lease.unindexed += new_rows
+            lease.new_rows += len(new_rows)
+            self.delta_sink.write_batch(new_rows, order_date)
+        lease.rows = total_rows
+        if self.sink.durable:
+            self.ledger.checkpoint(job, page, total_rows)
+        return {"ok": True}
+
+    def complete(self, token, result) -> dict:
+        with self._lock:
+            lease = self._lease_for(token)
+            del self._leases[token]
+        job = lease.job
+        names = result.pop("names", None)
+        if names and result.get("rows"):
+            bench_name, appeal_name = names
+            result["output_file"] = self.sink.finish_job(bench_name, appeal_name, job[2], append=lease.resumed)
+            if self.order_index is not None and lease.new_rows:
+                self.delta_sink.finish_job(bench_name, appeal_name, job[2], append=True)
+                result["new_rows"] = lease.new_rows
+            if lease.unindexed:
+                self.order_index.add_new(lease.unindexed, order_date=job[2])
+        result["worker"] = lease.worker
+        self.ledger.record(job, result)
+        logger.info(f"[{lease.worker}] {job} -> {result.get('status')} ({result.get('rows', 0)} rows)")
+        with self._lock:
+            if result.get("status") not in FINISHED_STATUSES and self._attempts[job] < self.max_attempts:
+                self._pending.append(job)  # failed: try again later, possibly on another machine
+            if not self._pending and not self._leases:
+                self.finished.set()
+        return {"ok": True}
+
+    def release(self, token) -> dict:
+        # the worker gave the job back (its browser died); it goes to the front for someone else
+        with self._lock:
+            lease = self._leases.pop(token, None)
+            if lease is not None:
+                self._pending.insert(0, lease.job)
+        return {"ok": lease is not None}
+
+    def status(self) -> dict:
+        with self._lock:
+            self._expire()
+            leases = [{"job": list(l.job), "worker": l.worker, "rows": l.rows,
+                       "expires_in": round(l.expires - time.monotonic(), 1)} for l in self._leases.values()]
+            pending = len(self._pending)
+        return {"pending": pending, "leased": leases, "ledger": self.ledger.status_counts()}
+
+    # ----------------------------
+    # HTTP front-end
+    # ----------------------------
+    def serve(self, host="127.0.0.1", port=8770):
+        coordinator = self
+        routes = {
+            "/lease": lambda body: coordinator.lease(body["worker"], tuple(body["previous"]) if body.get("previous") else None),
+            "/renew": lambda body: {"expired": coordinator.renew(body["tokens"])},
+            "/push": lambda body: coordinator.push(body["token"], body["page"], body["rows"], body["total_rows"]),
+            "/complete": lambda body: coordinator.complete(body["token"], body["result"]),
+            "/release": lambda body: coordinator.release(body["token"]),
+        }
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") in ("", "/status"):
+                    self._send(200, coordinator.status())
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def do_POST(self):
+                route = routes.get(self.path)
+                if route is None:
+                    self._send(404, {"error": "not found"})
+                    return
+                try:
+                    body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                    self._send(200, route(body))
+                except KeyError as e:
+                    self._send(409, {"error": str(e)})
+                except Exception as e:
+                    logger.error(f"Coordinator {self.path} failed: {e}")
+                    self._send(500, {"error": str(e)})
+
+            def _send(self, status, payload):
+                data = json.dumps(payload, default=str).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="coordinator-http", daemon=True).start()
+        logger.info(f"Coordinator serving {len(self._pending)} job(s) at http://{host}:{port}/")
+
+    def stop(self, grace=0):
+        # After the last job, keep answering {"job": None, "remaining": 0} for `grace` seconds
+        # (longer than the workers' poll_interval) so workers waiting on a lease that might lapse
+        # hear that the run is over instead of finding the port closed.
+        if getattr(self, "_server", None) is None:
+            return
+        if grace and self.finished.is_set():
+            time.sleep(grace)
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class CoordinatorClient:
+    # Worker-process side: the JobQueue, ledger and sink that runner()/BrowserPool talk to are
+    # thin adapters over this client (see RemoteJobQueue, RemoteLedger, RemoteSink).
+
+    def __init__(self, base_url, worker_id, poll_interval=5.0, timeout=30):
+        import requests
+        self.base_url = base_url.rstrip("/")
+        self.worker_id = worker_id
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.session = requests.Session()
+        self._leases = {}
+        # jobs whose lease the coordinator no longer holds; runner() stops them between pages
+        self._lost = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._heartbeat = None
+        # set once the coordinator reported that no job is left; it may shut down after that
+        self.finished = False
+
+    def call(self, path, payload):
+        response = self.session.post(f"{self.base_url}{path}", json=payload, timeout=self.timeout)
+        if response.status_code == 409:
+            raise KeyError(response.json().get("error"))
+        response.raise_for_status()
+        return response.json()
+
+    def status(self):
+        response = self.session.get(f"{self.base_url}/status", timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def lease(self, worker, previous=None):
+        return self.call("/lease", {"worker": f"{self.worker_id}/{worker}", "previous": previous})
+
+    def hold(self, job, lease):
+        with self._lock:
+            self._leases[job] = lease
+        if self._heartbeat is None:
+            self._heartbeat = threading.Thread(target=self._renew_loop, args=(lease["ttl"] / 3,),
+                                               name="coordinator-heartbeat", daemon=True)
+            self._heartbeat.start()
+
+    def lease_of(self, job):
+        with self._lock:
+            return self._leases.get(job)
+
+    def drop(self, job):
+        with self._lock:
+            self._lost.discard(job)
+            return self._leases.pop(job, None)
+
+    def mark_lost(self, job):
+        with self._lock:
+            if job in self._leases:
+                self._lost.add(job)
+
+    def lost(self, job) -> bool:
+        with self._lock:
+            return job in self._lost
+
+    def _renew_loop(self, interval):
+        while not self._stopped.wait(interval):
+            with self._lock:
+                tokens = [lease["token"] for lease in self._leases.values()]
+            if not tokens:
+                continue
+            try:
+                expired = self.call("/renew", {"tokens": tokens})["expired"]
+            except Exception as e:
+                logger.warning(f"Could not renew leases: {e}")
+                continue
+            with self._lock:
+                lost = [job for job, lease in self._leases.items() if lease["token"] in expired]
+                self._lost.update(lost)
+            for job in lost:
+                logger.warning(f"Lease on {job} expired at the coordinator; stopping it, it will be redone elsewhere.")
+
+    def close(self):
+        self._stopped.set()
+        self.session.close()
+
+
+class RemoteJobQueue:
+    # Same interface as worker_pool.JobQueue, but every take() leases a job from the coordinator.
+
+    def __init__(self, client):
+        self.client = client
+
+    def take(self, previous=None, block=False):
+        worker = threading.current_thread().name
+        while True:
+            try:
+                lease = self.client.lease(worker, list(previous) if previous else None)
+            except OSError as e:  # requests' connection errors and timeouts
+                if not self.client.finished:
+                    raise
+                logger.info(f"Coordinator is gone after its last job: {e}")
+                return None
+            if lease["job"] is not None:
+                job = (lease["job"][0], lease["job"][1], lease["job"][2])
+                self.client.hold(job, lease)
+                return job
+            if not lease["remaining"]:
+                self.client.finished = True
+                return None
+            # everything left is leased by someone else; wait in case a lease lapses
+            time.sleep(self.client.poll_interval)
+
+    def requeue(self, job):
+        lease = self.client.drop(job)
+        if lease is not None:
+            self.client.call("/release", {"token": lease["token"]})
+
+    def requeue_count(self, job) -> int:
+        lease = self.client.lease_of(job)
+        return lease["attempts"] if lease else 0
+
+    def task_done(self):
+        pass
+
+    def qsize(self):
+        status = self.client.status()
+        return status["pending"] + len(status["leased"])
+
+
+class RemoteLedger:
+    # Stands in for JobLedger inside a worker process: checkpoints carry the page's rows to the
+    # coordinator, record() completes the lease.
+
+    def __init__(self, client, sink):
+        self.client = client
+        self.sink = sink
+
+    def get(self, job):
+        lease = self.client.lease_of(job)
+        return {"last_page": lease["last_page"], "rows": lease["rows"]} if lease else None
+
+    def mark_running(self, job, worker=None):
+        # the coordinator marked it when leasing; drop rows a crashed earlier job left unsent
+        self.sink.take_rows()
+        self.sink.take_names()
+
+    def checkpoint(self, job, page_num: int, rows: int):
+        lease = self.client.lease_of(job)
+        try:
+            self.client.call("/push", {"token": lease["token"], "page": page_num,
+                                       "rows": self.sink.take_rows(), "total_rows": rows})
+        except KeyError:
+            # the lease lapsed before the heartbeat noticed; lease_lost() is True from here on
+            self.client.mark_lost(job)
+            raise
+
+    def lease_lost(self, job) -> bool:
+        return self.client.lost(job)
+
+    def status_counts(self) -> dict:
+        try:
+            return self.client.status()["ledger"]
+        except OSError as e:  # the coordinator shuts down once the last job is in
+            logger.info(f"Coordinator not reachable: {e}")
+            return {}
+
+    def close(self):
+        self.client.close()
+
+    def record(self, job, result: dict):
+        lease = self.client.drop(job)
+        if lease is None or result.get("status") == "lease_lost":
+            # another worker owns the job now; nothing of this run goes to the coordinator
+            self.sink.take_rows()
+            self.sink.take_names()
+            return
+        result = {key: value for key, value in result.items() if key not in ("job", "seconds", "worker")}
+        result["names"] = self.sink.take_names()
+        try:
+            self.client.call("/complete", {"token": lease["token"], "result": result})
+        except KeyError as e:
+            logger.warning(f"Coordinator no longer holds {job}: {e}")
+
+
+class RemoteSink:
+    # Collects the rows runner() writes until RemoteLedger.checkpoint ships them with the page number.
+    # Always "durable" so every page is shipped; the coordinator's own sink decides whether the
+    # page is checkpointed.
+    durable = True
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def write_batch(self, rows, order_date: str):
+        self._local.rows = getattr(self._local, "rows", []) + [list(row) for row in rows]
+
+    def reset_job(self, bench, appeal, order_date: str):
+        pass  # the coordinator resets its sink on the first push of a lease that starts at page 1
+
+    def take_rows(self):
+        rows, self._local.rows = getattr(self._local, "rows", []), []
+        return rows
+
+    def finish_job(self, bench, appeal, order_date: str, append: bool = False) -> str:
+        self._local.names = (bench, appeal)
+        return "coordinator"
+
+    def take_names(self):
+        names, self._local.names = getattr(self._local, "names", None), None
+        return names
@@ -0,0 +1,134 @@
+import json, threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.planner import DATE_FORMAT
+from app.logger import get_global_logger
+
+logger = get_global_logger()
+
+
+def target_dates(daemon_cfg: dict, last_finished=None, today=None):
+    # Returns (dates, refresh): every date to scrape, and the recent ones that are scraped again
+    # even when the ledger already has them finished, since orders keep appearing for a few days.
+    today = today or datetime.now().date()
+    days_back = daemon_cfg.get("days_back", 1)
+    refresh = [(today - timedelta(days=n)).strftime(DATE_FORMAT) for n in range(days_back, -1, -1)]
+
+    start = today - timedelta(days=days_back)
+    if daemon_cfg.get("dates", "recent") == "backfill" and last_finished is not None:
+        # everything since the last date the ledger finished, capped so a long outage stays bounded
+        oldest = today - timedelta(days=daemon_cfg.get("max_backfill_days", 30))
+        start = min(start, max(last_finished, oldest))
+    dates = [(start + timedelta(days=n)).strftime(DATE_FORMAT) for n in range((today - start).days + 1)]
+    return dates, refresh
+
+
+def next_run_time(daemon_cfg: dict, now: datetime, last_start=None) -> datetime:
+    if daemon_cfg.get("interval_minutes"):
+        if last_start is None:
+            return now
+        return last_start + timedelta(minutes=daemon_cfg["interval_minutes"])
+    # "times": ["10:00", "19:00"] -> the next of those wall-clock times
+    slots = sorted(datetime.strptime(t, "%H:%M").time() for t in daemon_cfg.get("times", ["10:00", "19:00"]))
+    for day in (now.date(), now.date() + timedelta(days=1)):
+        for slot in slots:
+            candidate = datetime.combine(day, slot)
+            if candidate > now:
+                return candidate
+
+
+class ScrapeDaemon:
+    # Stays resident and runs run_cycle(dates, refresh) on the configured schedule; the caller owns
+    # the warm browsers, sinks and ledger. A small JSON status page is served on health_port.
+
+    def __init__(self, daemon_cfg: dict, run_cycle, last_finished=None, extra_status=None):
+        self.cfg = daemon_cfg or {}
+        self.run_cycle = run_cycle
+        self.last_finished = last_finished or (lambda: None)
+        self.extra_status = extra_status or (lambda: {})
+        self.started_at = datetime.now()
+        self.state = "idle"
+        self.cycles = 0
+        self.last_cycle = None
+        self.next_run = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._server = None
+
+    def status(self) -> dict:
+        with self._lock:
+            status = {
+                "state": self.state,
+                "started_at": self.started_at.isoformat(timespec="seconds"),
+                "cycles": self.cycles,
+                "last_cycle": self.last_cycle,
+                "next_run": self.next_run.isoformat(timespec="seconds") if self.next_run else None,
+            }
+        status.update(self.extra_status())
+        return status
+
+    def serve_health(self, host="127.0.0.1", port=8766):
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/health"):
+                    self.send_error(404)
+                    return
+                payload = json.dumps(daemon.status(), default=str).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="daemon-health", daemon=True).start()
+        logger.info(f"Daemon status at http://{host}:{port}/health")
+
+    def run_once(self):
+        dates, refresh = target_dates(self.cfg, self.last_finished())
+        start = datetime.now()
+        with self._lock:
+            self.state = "running"
+        logger.info(f"Daemon cycle {self.cycles + 1}: {dates[0]}..{dates[-1]} (refreshing {', '.join(refresh)}).")
+        statuses, error = {}, None
+        try:
+            for result in self.run_cycle(dates, refresh) or []:
+                statuses[result.get("status")] = statuses.get(result.get("status"), 0) + 1
+        except Exception as e:
+            error = str(e)
+            logger.error(f"Daemon cycle failed: {e}")
+        with self._lock:
+            self.state = "idle"
+            self.cycles += 1
+            self.last_cycle = {
+                "dates": dates, "started": start.isoformat(timespec="seconds"),
+                "seconds": round((datetime.now() - start).total_seconds(), 1),
+                "statuses": statuses, "error": error,
+            }
+        return start
+
+    def run_forever(self):
+        last_start = None
+        if self.cfg.get("run_on_start", True):
+            last_start = self.run_once()
+        while not self._stopped.is_set():
+            next_run = next_run_time(self.cfg, datetime.now(), last_start)
+            with self._lock:
+                self.next_run = next_run
+            logger.info(f"Next daemon cycle at {next_run:%d/%m/%Y %H:%M}.")
+            # wake up now and then so a clock change or stop() is noticed
+            while not self._stopped.is_set() and datetime.now() < next_run:
+                self._stopped.wait(min(60.0, max(0.1, (next_run - datetime.now()).total_seconds())))
+            if not self._stopped.is_set():
+                last_start = self.run_once()
+
+    def stop(self):
+        self._stopped.set()
+        if self._server is not None:
+            self._server.shutdown()
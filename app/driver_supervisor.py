@@ -0,0 +1,120 @@
+import threading
+
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchWindowException, WebDriverException
+
+from app.browser import build_driver
+from app.web_scraper import TribunalWebScraper
+from app.logger import get_global_logger
+
+logger = get_global_logger()
+
+# WebDriverException is also the base of ordinary page errors, so only these messages mean
+# the browser itself is gone
+_DEAD_SESSION_MESSAGES = ("invalid session id", "no such session", "session deleted", "chrome not reachable",
+                          "disconnected", "target window already closed", "tab crashed", "session not created")
+
+
+def is_session_error(error) -> bool:
+    # True when the browser (or chromedriver) died and retrying on the same session is pointless
+    if isinstance(error, (InvalidSessionIdException, NoSuchWindowException)):
+        return True
+    if isinstance(error, WebDriverException):
+        message = str(error).lower()
+        return any(text in message for text in _DEAD_SESSION_MESSAGES)
+    # chromedriver itself is gone: selenium's HTTP client cannot connect any more
+    return isinstance(error, ConnectionError) or type(error).__name__ in ("MaxRetryError", "NewConnectionError")
+
+
+def _browser_rss_mb(driver):
+    # chromedriver + every Chrome process it started; None when psutil is not installed
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+    except (AttributeError, psutil.Error):
+        return None
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / (1024 * 1024)
+
+
+class DriverSupervisor:
+    # Owns one worker's Chrome: recycles it after N jobs or above a memory limit, pings it
+    # before each job and restarts it when the session is gone.
+
+    def __init__(self, cfg, name):
+        self.cfg = cfg
+        self.name = name
+        supervisor_cfg = cfg.get("supervisor", {})
+        self.recycle_after_jobs = supervisor_cfg.get("recycle_after_jobs", 50)
+        self.max_rss_mb = supervisor_cfg.get("max_rss_mb", 1500)
+        self.ping_timeout = supervisor_cfg.get("ping_timeout", 10)
+        self.driver = None
+        self.scraper = None
+        self.jobs_since_start = 0
+        self.restarts = 0
+        self.last_rss_mb = None
+
+    def start(self):
+        self.driver = build_driver(self.cfg, profile_name=self.name)
+        self.scraper = TribunalWebScraper(self.driver)
+        self.jobs_since_start = 0
+
+    def quit(self):
+        if self.driver is None:
+            return
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.warning(f"Could not quit the browser cleanly: {e}")
+        self.driver = self.scraper = None
+
+    def restart(self, reason):
+        logger.warning(f"Restarting browser after {self.jobs_since_start} job(s): {reason}.")
+        self.quit()
+        self.start()
+        self.restarts += 1
+
+    def responsive(self) -> bool:
+        # a hung Chrome blocks the WebDriver call itself, so ping from a helper thread
+        outcome = {}
+
+        def ping():
+            try:
+                outcome["ok"] = self.driver.execute_script("return 1") == 1
+            except Exception as e:
+                outcome["error"] = e
+
+        thread = threading.Thread(target=ping, name=f"{self.name}-ping", daemon=True)
+        thread.start()
+        thread.join(self.ping_timeout)
+        return outcome.get("ok", False)
+
+    def before_job(self) -> bool:
+        # Returns True when the browser was replaced, i.e. the search form has to be loaded again.
+        if self.driver is None:
+            self.start()
+            return True
+        reason = None
+        if self.recycle_after_jobs and self.jobs_since_start >= self.recycle_after_jobs:
+            reason = f"recycling after {self.recycle_after_jobs} job(s)"
+        else:
+            self.last_rss_mb = _browser_rss_mb(self.driver)
+            if self.max_rss_mb and self.last_rss_mb and self.last_rss_mb > self.max_rss_mb:
+                reason = f"using {self.last_rss_mb:.0f} MB (limit {self.max_rss_mb} MB)"
+            elif not self.responsive():
+                reason = f"no WebDriver response within {self.ping_timeout}s"
+        if reason is None:
+            return False
+        self.restart(reason)
+        return True
+
+    def after_job(self):
+        self.jobs_since_start += 1
@@ -0,0 +1,148 @@
+import os, sqlite3, threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from app.logger import get_global_logger, span
+
+logger = get_global_logger()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id         INTEGER PRIMARY KEY,
+    path       TEXT NOT NULL UNIQUE,
+    mtime      REAL NOT NULL,
+    size       INTEGER NOT NULL,
+    url        TEXT,
+    bench      TEXT,
+    appeal     TEXT,
+    parties    TEXT,
+    order_date TEXT,
+    pages      INTEGER,
+    error      TEXT,
+    indexed_at TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS order_text USING fts5(
+    bench, appeal, parties, body, tokenize = 'porter unicode61'
+);
+"""
+
+
+def _pdf_reader():
+    try:
+        from pypdf import PdfReader
+    except ImportError as e:
+        raise ImportError("The full-text index needs pypdf: pip install pypdf") from e
+    return PdfReader
+
+
+def extract_pdf_text(path: str):
+    # Runs inside the pool processes; returns (path, text, pages, error) so one bad PDF
+    # never takes the batch down.
+    PdfReader = _pdf_reader()
+    try:
+        reader = PdfReader(path)
+        text = "\n".join(page.extract_text() or "" for page in reader.pages)
+        return path, text, len(reader.pages), None
+    except Exception as e:
+        return path, "", 0, str(e)
+
+
+class OrderTextIndex:
+    # SQLite FTS5 index over the text of downloaded order PDFs, with the scraped metadata.
+    # Files are re-read only when their size or mtime changed since they were indexed.
+
+    def __init__(self, db_path: str, workers=None):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def stale(self, documents) -> list:
+        # documents are dicts with at least "path"; keeps the ones that need (re)indexing
+        with self._lock:
+            known = {path: (mtime, size) for path, mtime, size in
+                     self._conn.execute("SELECT path, mtime, size FROM documents")}
+        todo, seen = [], set()
+        for doc in documents:
+            path = doc["path"]
+            if path in seen or not os.path.exists(path):
+                continue
+            seen.add(path)
+            stat = os.stat(path)
+            if known.get(path) != (stat.st_mtime, stat.st_size):
+                todo.append(dict(doc, mtime=stat.st_mtime, size=stat.st_size))
+        return todo
+
+    def update(self, documents) -> dict:
+        todo = self.stale(documents)
+        stats = {"indexed": 0, "failed": 0, "unchanged": len({d["path"] for d in documents}) - len(todo)}
+        if not todo:
+            logger.info(f"Full-text index is up to date ({stats['unchanged']} file(s)).")
+            return stats
+
+        _pdf_reader()  # fail here rather than once per pool process
+        by_path = {doc["path"]: doc for doc in todo}
+        with span("fulltext", files=len(todo)):
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                chunksize = max(1, len(todo) // ((self.workers or os.cpu_count() or 1) * 4))
+                for path, text, pages, error in pool.map(extract_pdf_text, by_path, chunksize=chunksize):
+                    self._store(by_path[path], text, pages, error)
+                    stats["failed" if error else "indexed"] += 1
+                    if error:
+                        logger.warning(f"Could not read {path}: {error}")
+        logger.info(f"Full-text index: {stats}.")
+        return stats
+
+    def _store(self, doc, text, pages, error):
+        with self._lock:
+            with self._conn:
+                row = self._conn.execute("SELECT id FROM documents WHERE path = ?", (doc["path"],)).fetchone()
+                if row:
+                    self._conn.execute("DELETE FROM order_text WHERE rowid = ?", row)
+                    self._conn.execute("DELETE FROM documents WHERE id = ?", row)
+                cursor = self._conn.execute(
+                    "INSERT INTO documents (path, mtime, size, url, bench, appeal, parties, order_date, "
+                    "pages, error, indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (doc["path"], doc["mtime"], doc["size"], doc.get("url"), doc.get("bench"),
+                     doc.get("appeal"), doc.get("parties"), doc.get("order_date"), pages, error,
+                     datetime.now().isoformat(timespec="seconds")),
+                )
+                self._conn.execute(
+                    "INSERT INTO order_text (rowid, bench, appeal, parties, body) VALUES (?, ?, ?, ?, ?)",
+                    (cursor.lastrowid, doc.get("bench"), doc.get("appeal"), doc.get("parties"), text),
+                )
+
+    def search(self, query: str, limit=20) -> list:
+        # FTS5 query syntax ("capital gains", section NEAR/5 54F, parties:ACIT ...), best match first
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT d.bench, d.appeal, d.parties, d.order_date, d.path, d.url, "
+                "snippet(order_text, 3, '[', ']', ' ... ', 12) "
+                "FROM order_text JOIN documents d ON d.id = order_text.rowid "
+                "WHERE order_text MATCH ? ORDER BY bm25(order_text) LIMIT ?",
+                (query, limit),
+            ).fetchall()
+        keys = ("bench", "appeal", "parties", "order_date", "path", "url", "snippet")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def documents_from_dataset(df, downloader) -> list:
+    # scraped rows whose order PDF is on disk -> documents for OrderTextIndex.update
+    documents = []
+    for bench, appeal, parties, url, order_date in df[["Bench", "Appeal", "Parties", "Order Link", "Order Date"]].itertuples(index=False):
+        path = downloader.path_for(url) if isinstance(url, str) else None
+        if path:
+            documents.append({"path": path, "url": url, "bench": bench, "appeal": appeal,
+                              "parties": parties, "order_date": order_date})
+    return documents
@@ -0,0 +1,90 @@
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+from app.constant import DEFAULT_WAIT_TIME, PAGE_FORM_STATE_JS
+from app.result_parser import parse_result_rows
+from app.logger import get_global_logger, timed
+
+logger = get_global_logger()
+
+
+def session_from_driver(driver, pool_size: int = 4) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    session.headers["User-Agent"] = driver.execute_script("return navigator.userAgent;")
+    session.headers["Referer"] = driver.current_url
+    for cookie in driver.get_cookies():
+        session.cookies.set(cookie["name"], cookie["value"],
+                            domain=cookie.get("domain", ""), path=cookie.get("path", "/"))
+    return session
+
+
+class HttpResultPager:
+    # Fetches result pages with plain HTTP once the CAPTCHA has been accepted in the browser.
+
+    def __init__(self, session, form_state, concurrency=1, verify=True, timeout=DEFAULT_WAIT_TIME):
+        self.session = session
+        self.action = form_state["action"]
+        self.method = form_state["method"]
+        self.fields = [tuple(f) for f in form_state["fields"]]
+        self.concurrency = max(1, int(concurrency))
+        self.verify = verify
+        self.timeout = timeout
+        # page_num -> (html, url) of each fetched page, filled only when keep_html is set
+        self.keep_html = False
+        self.html = {}
+
+    @classmethod
+    def from_driver(cls, driver, pagination_cfg: dict):
+        form_state = driver.execute_script(PAGE_FORM_STATE_JS)
+        if not form_state:
+            logger.warning("Page buttons are not inside a form; HTTP pagination unavailable.")
+            return None
+
+        concurrency = pagination_cfg.get("concurrency", 1)
+        session = session_from_driver(driver, pool_size=max(1, concurrency))
+        return cls(session, form_state,
+                   concurrency=concurrency,
+                   verify=pagination_cfg.get("verify_ssl", True),
+                   timeout=pagination_cfg.get("timeout", DEFAULT_WAIT_TIME))
+
+    @timed("http_page")
+    def fetch_page(self, page_num: int):
+        payload = self.fields + [("btnPage", str(page_num))]
+        if self.method == "post":
+            response = self.session.post(self.action, data=payload, verify=self.verify, timeout=self.timeout)
+        else:
+            response = self.session.get(self.action, params=payload, verify=self.verify, timeout=self.timeout)
+        response.raise_for_status()
+        if self.keep_html:
+            self.html[page_num] = (response.text, response.url)
+        return parse_result_rows(response.text, base_url=response.url)
+
+    def iter_pages(self, page_nums):
+        # Yields (page_num, rows) in page order while up to `concurrency` requests run ahead.
+        # Stops with the exception of the first page that fails.
+        page_nums = list(page_nums)
+        if not page_nums:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(page_nums))) as pool:
+            futures = [(page_num, pool.submit(self.fetch_page, page_num)) for page_num in page_nums]
+            try:
+                for page_num, future in futures:
+                    try:
+                        rows = future.result()
+                    except Exception as e:
+                        logger.warning(f"Failed to fetch page {page_num} over HTTP: {e}")
+                        raise
+                    logger.info(f"-> Fetched page {page_num} over HTTP")
+                    yield page_num, rows
+            finally:
+                for _, future in futures:
+                    future.cancel()
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,150 @@
+import os, pathlib, sqlite3, threading
+from datetime import datetime
+
+from app.logger import get_global_logger
+
+logger = get_global_logger()
+
+# "done" and "empty" are finished; anything else is picked up again on the next run
+FINISHED_STATUSES = ("done", "empty")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_key     TEXT PRIMARY KEY,
+    bench       TEXT NOT NULL,
+    appeal      TEXT NOT NULL,
+    order_date  TEXT NOT NULL,
+    status      TEXT NOT NULL DEFAULT 'pending',
+    rows        INTEGER NOT NULL DEFAULT 0,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    output_file TEXT,
+    error       TEXT,
+    worker      TEXT,
+    last_page   INTEGER NOT NULL DEFAULT 0,
+    updated_at  TEXT
+)
+"""
+
+# columns added after the first release, applied to older ledgers on open
+_MIGRATIONS = {
+    "last_page": "ALTER TABLE jobs ADD COLUMN last_page INTEGER NOT NULL DEFAULT 0",
+}
+
+
+def job_key(job) -> str:
+    bench, appeal, order_date = job
+    return f"{bench}|{appeal}|{order_date}"
+
+
+class JobLedger:
+    # Durable record of every bench/appeal/date job so an interrupted run can resume.
+
+    def __init__(self, db_path: str, readonly: bool = False):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        if readonly:
+            # for dry runs (`main.py plan`): no schema, no migrations, nothing written
+            uri = pathlib.Path(os.path.abspath(db_path)).as_uri() + "?mode=ro"
+            self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, ddl in _MIGRATIONS.items():
+            if column not in columns:
+                self._conn.execute(ddl)
+        self._conn.commit()
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            self._conn.commit()
+            return cursor.fetchall()
+
+    def register(self, jobs):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO jobs (job_key, bench, appeal, order_date, updated_at) VALUES (?, ?, ?, ?, ?)",
+                [(job_key(job), str(job[0]), str(job[1]), job[2], _now()) for job in jobs],
+            )
+            self._conn.commit()
+
+    def unfinished(self, jobs) -> list:
+        # keeps the caller's order; jobs never seen before count as unfinished
+        self.register(jobs)
+        finished = {
+            row[0] for row in self._execute(
+                f"SELECT job_key FROM jobs WHERE status IN ({','.join('?' * len(FINISHED_STATUSES))})",
+                FINISHED_STATUSES,
+            )
+        }
+        return [job for job in jobs if job_key(job) not in finished]
+
+    def mark_running(self, job, worker=None):
+        # a finished job that runs again starts from page 1; an interrupted one keeps its checkpoint
+        self._execute(
+            f"""UPDATE jobs SET status = 'running', worker = ?, updated_at = ?,
+                              last_page = CASE WHEN status IN ({','.join('?' * len(FINISHED_STATUSES))})
+                                               THEN 0 ELSE last_page END,
+                              rows = CASE WHEN status IN ({','.join('?' * len(FINISHED_STATUSES))})
+                                          THEN 0 ELSE rows END
+               WHERE job_key = ?""",
+            (worker, _now(), *FINISHED_STATUSES, *FINISHED_STATUSES, job_key(job)),
+        )
+
+    def checkpoint(self, job, page_num: int, rows: int):
+        self._execute(
+            "UPDATE jobs SET last_page = ?, rows = ?, updated_at = ? WHERE job_key = ?",
+            (page_num, rows, _now(), job_key(job)),
+        )
+
+    def lease_lost(self, job) -> bool:
+        # a local ledger owns every job (see coordinator.RemoteLedger for leased ones)
+        return False
+
+    def record(self, job, result: dict):
+        self._execute(
+            """UPDATE jobs SET status = ?, rows = MAX(rows, ?), attempts = attempts + ?, output_file = ?,
+                              error = ?, worker = ?, updated_at = ?
+               WHERE job_key = ?""",
+            (result.get("status", "failed"), result.get("rows", 0), result.get("attempts", 0),
+             result.get("output_file"), result.get("error"), result.get("worker"), _now(), job_key(job)),
+        )
+
+    def get(self, job) -> dict:
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM jobs WHERE job_key = ?", (job_key(job),))
+            row = cursor.fetchone()
+        return dict(zip([c[0] for c in cursor.description], row)) if row else None
+
+    def yield_stats(self) -> dict:
+        # {(bench, appeal): {"runs", "hits", "rows"}} over every finished job, for the planner
+        rows = self._execute(
+            f"""SELECT bench, appeal, COUNT(*), SUM(status = 'done'), SUM(rows) FROM jobs
+                WHERE status IN ({','.join('?' * len(FINISHED_STATUSES))}) GROUP BY bench, appeal""",
+            FINISHED_STATUSES,
+        )
+        return {(bench, appeal): {"runs": runs, "hits": hits, "rows": total}
+                for bench, appeal, runs, hits, total in rows}
+
+    def last_finished_date(self):
+        # latest order date with a finished job, as a date; None on an empty ledger
+        rows = self._execute(
+            f"SELECT DISTINCT order_date FROM jobs WHERE status IN ({','.join('?' * len(FINISHED_STATUSES))})",
+            FINISHED_STATUSES,
+        )
+        dates = [datetime.strptime(row[0], "%d/%m/%Y").date() for row in rows]
+        return max(dates) if dates else None
+
+    def status_counts(self) -> dict:
+        return dict(self._execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
@@ -1,11 +1,16 @@
+import functools
+import json
 import logging
+import math
 import os
 import sys
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timedelta
 
 
 
-DEFAULT_FORMAT = "%(asctime)s [%(levelname)s]: %(message)s"
+DEFAULT_FORMAT = "%(asctime)s [%(levelname)s] [%(threadName)s]: %(message)s"
 DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 TRACE_LEVEL_NUM = 10
@@ -31,8 +36,37 @@ def _add_console_handler(logger, level):
     logger.addHandler(handler)
 
 
+def _day_of(ts):
+    # the day ts falls on as YYYY-MM-DD, and the timestamp at which the next day starts
+    day = datetime.fromtimestamp(ts).date()
+    return day.isoformat(), datetime.combine(day + timedelta(days=1), datetime.min.time()).timestamp()
+
+
+class DailyFileHandler(logging.FileHandler):
+    # FileHandler on log_dir(day)/file_name that moves on to the next day's file at midnight, so a
+    # resident daemon keeps logging under the current day rather than the one it started on.
+    def __init__(self, log_dir, file_name, encoding="utf-8"):
+        self.log_dir = log_dir
+        self.file_name = file_name
+        day, self._rollover = _day_of(time.time())
+        super().__init__(os.path.join(log_dir(day), file_name), encoding=encoding)
+
+    def emit(self, record):
+        # called under the handler lock, so the stream can be swapped here
+        if record.created >= self._rollover:
+            day, self._rollover = _day_of(record.created)
+            if self.stream is not None:
+                self.stream.close()
+                self.stream = None
+            self.baseFilename = os.path.abspath(os.path.join(self.log_dir(day), self.file_name))
+        super().emit(record)
+
+
 def setup_logger(name="app_logger",log_dir="logs",log_level=logging.DEBUG,to_console=True,to_file=True):
-    os.makedirs(log_dir, exist_ok=True)
+    # log_dir is a directory, or a function of the day (YYYY-MM-DD) that returns one; with a
+    # function, the log file follows the date
+    if to_file and not callable(log_dir):
+        os.makedirs(log_dir, exist_ok=True)
     logger = logging.getLogger(name)
 
     if logger.hasHandlers():
@@ -43,8 +77,10 @@ def setup_logger(name="app_logger",log_dir="logs",log_level=logging.DEBUG,to_con
 
     if to_file:
         # timestamp = datetime.now().strftime('%Y%m%d_%H%M')
-        file_path = os.path.join(log_dir, f"{name}.log")
-        file_handler = logging.FileHandler(file_path, encoding='utf-8')
+        if callable(log_dir):
+            file_handler = DailyFileHandler(log_dir, f"{name}.log")
+        else:
+            file_handler = logging.FileHandler(os.path.join(log_dir, f"{name}.log"), encoding='utf-8')
         file_handler.setFormatter(_get_formatter())
         file_handler.setLevel(TRACE_LEVEL_NUM)
         logger.addHandler(file_handler)
@@ -62,5 +98,156 @@ def set_global_logger(logger):
     global _active_logger
     _active_logger = logger
 
+class _GlobalLogger:
+    # What modules keep from get_global_logger() at import time: it forwards to whichever logger
+    # set_global_logger installed last, so importing a module before the CLI has configured
+    # logging still ends up in the right log.
+    def __getattr__(self, name):
+        return getattr(_active_logger or logging.getLogger("default_logger"), name)
+
+_GLOBAL_LOGGER = _GlobalLogger()
+
 def get_global_logger():
-    return _active_logger or logging.getLogger("default_logger")
+    return _GLOBAL_LOGGER
+
+
+# --- Timing spans (JSON lines, off unless setup_timing is called) ---
+_span_recorder = None
+_span_context = threading.local()
+
+
+class SpanRecorder:
+    # path is a file, or a function of the day (YYYY-MM-DD) that returns one; with a function,
+    # spans move on to the next day's file at midnight like DailyFileHandler
+    def __init__(self, path):
+        self._path_for_day = path if callable(path) else None
+        self._rollover = float("inf")
+        if self._path_for_day is not None:
+            day, self._rollover = _day_of(time.time())
+            path = self._path_for_day(day)
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+        self._durations = {}
+
+    def _roll(self, now):
+        day, self._rollover = _day_of(now)
+        self._file.close()
+        self.path = self._path_for_day(day)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def record(self, phase, duration, ok=True, **fields):
+        now = time.time()
+        event = {
+            "ts": datetime.fromtimestamp(now).isoformat(timespec="milliseconds"),
+            "job": getattr(_span_context, "job_id", None),
+            "worker": threading.current_thread().name,
+            "phase": phase,
+            "ms": round(duration * 1000, 2),
+            "ok": ok,
+            **fields,
+        }
+        line = json.dumps(event, default=str)
+        with self._lock:
+            if now >= self._rollover:
+                self._roll(now)
+            self._file.write(line + "\n")
+            self._durations.setdefault(phase, []).append(duration)
+
+    def summary(self):
+        with self._lock:
+            durations = {phase: sorted(values) for phase, values in self._durations.items()}
+        lines = [f"{'phase':<22}{'count':>7}{'p50':>10}{'p95':>10}{'total':>11}"]
+        for phase, values in sorted(durations.items(), key=lambda item: -sum(item[1])):
+            lines.append(f"{phase:<22}{len(values):>7}{_percentile(values, 50):>9.2f}s"
+                         f"{_percentile(values, 95):>9.2f}s{sum(values):>10.1f}s")
+        return "\n".join(lines)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class _Span:
+    __slots__ = ("recorder", "phase", "fields", "start")
+
+    def __init__(self, recorder, phase, fields):
+        self.recorder = recorder
+        self.phase = phase
+        self.fields = fields
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.recorder.record(self.phase, time.perf_counter() - self.start, ok=exc_type is None, **self.fields)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def setup_timing(log_dir="logs", enabled=True, file_name="spans.jsonl"):
+    # log_dir as in setup_logger: a directory, or a function of the day that returns one
+    global _span_recorder
+    if not enabled:
+        _span_recorder = None
+        return None
+    if callable(log_dir):
+        _span_recorder = SpanRecorder(lambda day: os.path.join(log_dir(day), file_name))
+    else:
+        os.makedirs(log_dir, exist_ok=True)
+        _span_recorder = SpanRecorder(os.path.join(log_dir, file_name))
+    return _span_recorder
+
+
+def set_span_job(job_id):
+    # spans recorded on this thread are tagged with job_id until it is changed
+    _span_context.job_id = job_id
+
+
+def span(phase, **fields):
+    if _span_recorder is None:
+        return _NULL_SPAN
+    return _Span(_span_recorder, phase, fields)
+
+
+def timed(phase):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _span_recorder is None:
+                return func(*args, **kwargs)
+            with _Span(_span_recorder, phase, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def timing_summary():
+    return _span_recorder.summary() if _span_recorder is not None else ""
+
+
+def close_timing():
+    global _span_recorder
+    if _span_recorder is not None:
+        _span_recorder.close()
+        _span_recorder = None
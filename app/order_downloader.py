@@ -0,0 +1,205 @@
+import hashlib, os, sqlite3, threading, time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from urllib.parse import urlsplit, unquote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.order_index import normalize_url
+from app.utils import Helper
+from app.logger import get_global_logger, span
+
+logger = get_global_logger()
+
+CHUNK_SIZE = 64 * 1024
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    url_key       TEXT PRIMARY KEY,
+    url           TEXT NOT NULL,
+    path          TEXT NOT NULL,
+    sha256        TEXT NOT NULL,
+    size          INTEGER NOT NULL,
+    downloaded_at TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS files_sha256 ON files (sha256);
+"""
+
+
+class HostRateLimiter:
+    # At most `rate` requests per second to any one host, shared by all download threads.
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host: str):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def order_file_name(url: str) -> str:
+    # readable name from the URL, plus a short hash so different URLs never collide
+    base = os.path.basename(unquote(urlsplit(url).path)) or "order"
+    stem, ext = os.path.splitext(base)
+    digest = hashlib.sha1(normalize_url(url).encode("utf-8")).hexdigest()[:8]
+    return Helper.sanitize_Win_filename(f"{stem}_{digest}{ext or '.pdf'}")
+
+
+class OrderDownloader:
+    def __init__(self, manifest_path: str, workers=8, rate_per_host=4.0, retries=4, backoff=0.5,
+                 timeout=30, verify=True, session=None):
+        self.workers = max(1, int(workers))
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.verify = verify
+        self.limiter = HostRateLimiter(rate_per_host)
+
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.workers, pool_maxsize=self.workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        os.makedirs(os.path.dirname(os.path.abspath(manifest_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(manifest_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    @classmethod
+    def from_config(cls, output_dir: str, downloads_cfg: dict = None):
+        downloads_cfg = downloads_cfg or {}
+        return cls(
+            os.path.join(output_dir, "downloads.sqlite3"),
+            workers=downloads_cfg.get("workers", 8),
+            rate_per_host=downloads_cfg.get("rate_per_host", 4.0),
+            retries=downloads_cfg.get("retries", 4),
+            backoff=downloads_cfg.get("backoff", 0.5),
+            timeout=downloads_cfg.get("timeout", 30),
+            verify=downloads_cfg.get("verify_ssl", True),
+        )
+
+    # ----------------------------
+    # Manifest
+    # ----------------------------
+    def _known_path(self, url_key):
+        with self._lock:
+            row = self._conn.execute("SELECT path FROM files WHERE url_key = ?", (url_key,)).fetchone()
+        return row[0] if row and os.path.exists(row[0]) else None
+
+    def path_for(self, url: str):
+        # local copy of an order link, or None when it has not been downloaded
+        return self._known_path(normalize_url(url))
+
+    def _path_for_hash(self, sha256):
+        with self._lock:
+            rows = self._conn.execute("SELECT path FROM files WHERE sha256 = ?", (sha256,)).fetchall()
+        return next((path for (path,) in rows if os.path.exists(path)), None)
+
+    def _remember(self, url_key, url, path, sha256, size):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                (url_key, url, path, sha256, size, datetime.now().isoformat(timespec="seconds")),
+            )
+            self._conn.commit()
+
+    # ----------------------------
+    # Download
+    # ----------------------------
+    def _fetch(self, url, part_path):
+        # Streams url into part_path, resuming from whatever a previous run left behind.
+        host = urlsplit(url).netloc
+        for attempt in range(self.retries + 1):
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            headers = {"Range": f"bytes={offset}-"} if offset else {}
+            self.limiter.wait(host)
+            try:
+                with self.session.get(url, headers=headers, stream=True, timeout=self.timeout,
+                                      verify=self.verify) as response:
+                    if response.status_code == 416:
+                        return  # the part file already holds the whole body
+                    if response.status_code in RETRY_STATUSES:
+                        raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+                    response.raise_for_status()
+                    mode = "ab" if offset and response.status_code == 206 else "wb"
+                    with open(part_path, mode) as f:
+                        for chunk in response.iter_content(CHUNK_SIZE):
+                            f.write(chunk)
+                    return
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                status = getattr(getattr(e, "response", None), "status_code", None)
+                if attempt == self.retries or (status is not None and status not in RETRY_STATUSES):
+                    raise
+                delay = self.backoff * (2 ** attempt)
+                logger.warning(f"Retrying {url} in {delay:.1f}s ({e}).")
+                time.sleep(delay)
+
+    def download(self, url: str, dest_dir: str) -> str:
+        # Returns "skipped", "downloaded" or "duplicate"; raises when the file cannot be fetched.
+        url_key = normalize_url(url)
+        if self._known_path(url_key):
+            return "skipped"
+
+        os.makedirs(dest_dir, exist_ok=True)
+        path = os.path.join(dest_dir, order_file_name(url))
+        part_path = path + ".part"
+        with span("download"):
+            self._fetch(url, part_path)
+
+        digest, size = hashlib.sha256(), 0
+        with open(part_path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                size += len(chunk)
+        sha256 = digest.hexdigest()
+
+        existing = self._path_for_hash(sha256)
+        if existing:
+            # same document behind another link: keep one copy on disk
+            os.remove(part_path)
+            self._remember(url_key, url, existing, sha256, size)
+            return "duplicate"
+
+        os.replace(part_path, path)
+        self._remember(url_key, url, path, sha256, size)
+        return "downloaded"
+
+    def download_all(self, items) -> dict:
+        # items are (url, dest_dir) pairs
+        stats = {"downloaded": 0, "duplicate": 0, "skipped": 0, "failed": 0}
+        items = list(dict.fromkeys((url, dest_dir) for url, dest_dir in items if url))
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="download") as pool:
+            futures = {pool.submit(self.download, url, dest_dir): url for url, dest_dir in items}
+            for future in as_completed(futures):
+                try:
+                    stats[future.result()] += 1
+                except Exception as e:
+                    stats["failed"] += 1
+                    logger.error(f"Download failed for {futures[future]}: {e}")
+        elapsed = time.perf_counter() - start
+        logger.info(f"Downloads: {stats} in {elapsed:.1f}s.")
+        stats["seconds"] = round(elapsed, 2)
+        return stats
+
+    def close(self):
+        self.session.close()
+        with self._lock:
+            self._conn.close()
+
+
+def orders_dir(output_dir: str, order_date: str) -> str:
+    ref_date = datetime.strptime(order_date, "%d/%m/%Y").strftime("%d%m%Y")
+    return os.path.join(output_dir, f"{ref_date}_DATA", "orders")
@@ -0,0 +1,82 @@
+import os, sqlite3, threading
+from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from app.logger import get_global_logger
+
+logger = get_global_logger()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    url_key     TEXT PRIMARY KEY,
+    url         TEXT NOT NULL,
+    bench       TEXT,
+    appeal      TEXT,
+    parties     TEXT,
+    order_date  TEXT,
+    first_seen  TEXT NOT NULL
+) WITHOUT ROWID
+"""
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    # Same order, different spelling (case, default port, fragment, query order) -> same key.
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+class OrderIndex:
+    # Every order link ever scraped, across runs; used to emit only the orders not seen before.
+
+    def __init__(self, db_path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def add_new(self, rows, order_date=None) -> list:
+        # rows are [bench, appeal, parties, order_link]; returns the ones that were not indexed yet
+        new_rows, now = [], datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            with self._conn:
+                for row in rows:
+                    bench, appeal, parties, url = row
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO orders VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (normalize_url(url), url, bench, appeal, parties, order_date, now),
+                    )
+                    if cursor.rowcount:
+                        new_rows.append(row)
+        return new_rows
+
+    def unseen(self, rows) -> list:
+        # the rows add_new would return, without recording them; for a delta sink that only
+        # writes at finish_job, so orders are indexed once their delta is on disk
+        with self._lock:
+            return [row for row in rows if self._conn.execute(
+                "SELECT 1 FROM orders WHERE url_key = ?", (normalize_url(row[3]),)).fetchone() is None]
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM orders WHERE url_key = ?", (normalize_url(url),)
+            ).fetchone() is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,193 @@
+import gzip, hashlib, os, sqlite3, threading, time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from app.result_parser import parse_result_rows
+from app.logger import get_global_logger
+
+logger = get_global_logger()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    bench      TEXT NOT NULL,
+    appeal     TEXT NOT NULL,
+    order_date TEXT NOT NULL,
+    page       INTEGER NOT NULL,
+    digest     TEXT NOT NULL,
+    url        TEXT,
+    fetched_at TEXT NOT NULL,
+    PRIMARY KEY (bench, appeal, order_date, page)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS pages_digest ON pages (digest);
+CREATE TABLE IF NOT EXISTS blobs (
+    digest  TEXT PRIMARY KEY,
+    size    INTEGER NOT NULL,
+    used_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def _parse_blob(item):
+    # Runs inside the replay pool: (path, url) -> rows, or None when the blob is gone
+    path, url = item
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return parse_result_rows(f.read(), base_url=url or "")
+    except OSError:
+        return None
+
+
+class PageCache:
+    # Raw result-page HTML keyed by bench/appeal/date/page. Bodies are stored once per sha256
+    # under objects/ as gzip; when the total passes max_bytes the least recently written
+    # bodies (and the pages pointing at them) are evicted.
+
+    def __init__(self, root: str, max_bytes=2 * 1024 ** 3, workers=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.workers = workers
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(root, "pages.sqlite3"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    @classmethod
+    def from_config(cls, output_dir: str, cache_cfg: dict):
+        return cls(cache_cfg.get("dir") or os.path.join(output_dir, "page_cache"),
+                   max_bytes=int(cache_cfg.get("max_mb", 2048) * 1024 * 1024),
+                   workers=cache_cfg.get("workers"))
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, "objects", digest[:2], f"{digest}.html.gz")
+
+    # ----------------------------
+    # Record
+    # ----------------------------
+    def put(self, bench, appeal, order_date: str, page: int, html: str, url: str = None) -> str:
+        # Never raises: a full disk should not cost the scrape its rows.
+        try:
+            return self._put(bench, appeal, order_date, page, html, url)
+        except Exception as e:
+            logger.warning(f"Could not cache page {page} of {bench} / {appeal} / {order_date}: {e}")
+            return None
+
+    def _put(self, bench, appeal, order_date, page, html, url):
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest)
+        with self._lock:
+            known = self._conn.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        if not known or not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            part = f"{path}.{threading.get_ident()}.part"
+            with open(part, "wb") as f:
+                f.write(gzip.compress(data, compresslevel=6))
+            os.replace(part, path)
+        size = os.path.getsize(path)
+        with self._lock:
+            with self._conn:
+                # whether the body is new is decided by this insert, under the same lock as the
+                # total; two threads putting the same page count its size once
+                if self._conn.execute("INSERT OR IGNORE INTO blobs VALUES (?, ?, ?)",
+                                      (digest, size, time.time())).rowcount:
+                    self._total += size
+                else:
+                    self._conn.execute("UPDATE blobs SET used_at = ? WHERE digest = ?", (time.time(), digest))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (str(bench), str(appeal), order_date, page, digest, url,
+                     datetime.now().isoformat(timespec="seconds")),
+                )
+            if self.max_bytes and self._total > self.max_bytes:
+                self._evict()
+        return digest
+
+    def _evict(self):
+        # down to 90% of the limit so eviction does not run on every put near the edge
+        target = self.max_bytes * 0.9
+        evicted = 0
+        with self._conn:
+            for digest, size in self._conn.execute("SELECT digest, size FROM blobs ORDER BY used_at").fetchall():
+                if self._total <= target:
+                    break
+                self._conn.execute("DELETE FROM pages WHERE digest = ?", (digest,))
+                self._conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+                try:
+                    os.remove(self.blob_path(digest))
+                except FileNotFoundError:
+                    pass
+                self._total -= size
+                evicted += 1
+        logger.info(f"Page cache: evicted {evicted} cached page(s), {self._total / 1024 ** 2:.1f} MB left.")
+
+    # ----------------------------
+    # Replay
+    # ----------------------------
+    def get(self, bench, appeal, order_date: str, page: int):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest FROM pages WHERE bench = ? AND appeal = ? AND order_date = ? AND page = ?",
+                (str(bench), str(appeal), order_date, page),
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            with gzip.open(self.blob_path(row[0]), "rt", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def pages(self, order_date: str = None, bench=None) -> list:
+        # [(bench, appeal, order_date, page, digest, url)] in scrape order
+        sql, params = "SELECT bench, appeal, order_date, page, digest, url FROM pages WHERE 1 = 1", []
+        if order_date:
+            sql += " AND order_date = ?"
+            params.append(order_date)
+        if bench is not None:
+            sql += " AND bench = ?"
+            params.append(str(bench))
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return sorted(rows, key=lambda r: (datetime.strptime(r[2], "%d/%m/%Y"), r[0], r[1], r[3]))
+
+    def replay(self, sink, order_date: str = None, bench=None) -> dict:
+        # Re-runs parse_result_rows over every cached page and writes the rows to `sink` exactly
+        # as runner() would have, one finish_job per bench/appeal/date. Each job replaces what an
+        # earlier replay wrote for it, so replaying again gives the same output.
+        pages = self.pages(order_date, bench)
+        stats = {"pages": 0, "rows": 0, "missing": 0}
+        if not pages:
+            return stats
+        items = [(self.blob_path(digest), url) for _, _, _, _, digest, url in pages]
+        current = None
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for (bench_name, appeal_name, day, page, _, _), rows in zip(
+                    pages, pool.map(_parse_blob, items, chunksize=64)):
+                if current != (bench_name, appeal_name, day):
+                    if current is not None:
+                        sink.finish_job(*current)
+                    current = (bench_name, appeal_name, day)
+                    sink.reset_job(*current)
+                if rows is None:
+                    stats["missing"] += 1
+                    continue
+                batch = [[bench_name, appeal_name, parties, link] for parties, link in rows
+                         if parties is not None and link]
+                sink.write_batch(batch, day)
+                stats["pages"] += 1
+                stats["rows"] += len(batch)
+        sink.finish_job(*current)
+        return stats
+
+    def stats(self) -> dict:
+        with self._lock:
+            pages = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            blobs = self._conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0]
+        return {"pages": pages, "bodies": blobs, "mb": round(self._total / 1024 ** 2, 1)}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
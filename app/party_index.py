@@ -0,0 +1,220 @@
+import difflib, glob, os, re, sqlite3, threading
+from datetime import datetime
+
+from app.order_index import normalize_url
+from app.sinks import COLUMNS, DATE_COLUMN, dataset_files
+from app.utils import Helper, PARTY_SPLIT
+from app.logger import get_global_logger
+
+logger = get_global_logger()
+
+MATCH_MODES = ("exact", "prefix", "contains", "fuzzy")
+
+_HYPERLINK = re.compile(r'=HYPERLINK\("([^"]+)"')
+_LEGACY_NAME = re.compile(r"_(\d{8})(?:_delta)?\.xlsx$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    url_key    TEXT PRIMARY KEY,
+    url        TEXT,
+    bench      TEXT,
+    appeal     TEXT,
+    parties    TEXT,
+    order_date TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS names (
+    id        INTEGER PRIMARY KEY,
+    key       TEXT NOT NULL UNIQUE,
+    key_alpha TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS names_key_alpha ON names (key_alpha);
+CREATE TABLE IF NOT EXISTS name_orders (
+    name_id INTEGER NOT NULL,
+    url_key TEXT NOT NULL,
+    side    TEXT NOT NULL,
+    PRIMARY KEY (name_id, url_key)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE IF NOT EXISTS name_trigrams USING fts5(
+    key, content = 'names', content_rowid = 'id', tokenize = 'trigram'
+);
+CREATE TABLE IF NOT EXISTS sources (
+    path  TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size  INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def party_names(parties: str) -> list:
+    # "APPELLANT,CITY\nVS.\nRESPONDENT, CITY" -> [(side, name), ...]; each side is indexed with
+    # and without the trailing ", CITY ..." part so "n satish exports private limited" is exact
+    names = []
+    for side, text in zip(("appellant", "respondent"), PARTY_SPLIT.split(parties, maxsplit=1)):
+        for name in {text, text.split(",", 1)[0]}:
+            if Helper._normalize_alphanumeric(name):
+                names.append((side, name))
+    return names
+
+
+def _legacy_frame(path: str):
+    # per-job xlsx from the excel sink: links are HYPERLINK formulas that pandas reads as NaN
+    import pandas as pd
+    from openpyxl import load_workbook
+    workbook = load_workbook(path, read_only=True)
+    try:
+        rows = [list(row[:4]) for row in workbook.active.iter_rows(min_row=2, values_only=True) if len(row) >= 4]
+    finally:
+        workbook.close()
+    df = pd.DataFrame(rows, columns=COLUMNS)
+    df["Order Link"] = df["Order Link"].astype(str).str.extract(_HYPERLINK, expand=False).fillna(df["Order Link"])
+    match = _LEGACY_NAME.search(os.path.basename(path))
+    df[DATE_COLUMN] = datetime.strptime(match.group(1), "%d%m%Y").strftime("%d/%m/%Y") if match else None
+    return df
+
+
+class PartyIndex:
+    # Party names from every run (dataset CSV/parquet and legacy xlsx) keyed with Helper's
+    # normalisers, plus a trigram index for contains/fuzzy lookups.
+
+    def __init__(self, db_path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        if "rows" in [col[1] for col in self._conn.execute("PRAGMA table_info(sources)")]:
+            # sources used to carry a rows column; rebuilt, the next sync re-reads every file once
+            self._conn.execute("DROP TABLE sources")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    # ----------------------------
+    # Ingest
+    # ----------------------------
+    def sync(self, output_dir: str) -> dict:
+        # Reads only files that are new or changed since the last sync. A changed CSV is read in
+        # full, since a re-scraped job rewrites it rather than appending; orders already indexed
+        # are skipped by url_key.
+        paths = dataset_files(os.path.join(output_dir, "dataset"))
+        paths += sorted(p for p in glob.glob(os.path.join(output_dir, "*_DATA", "*.xlsx"))
+                        if _LEGACY_NAME.search(os.path.basename(p)))
+        with self._lock:
+            known = {path: (mtime, size) for path, mtime, size in
+                     self._conn.execute("SELECT path, mtime, size FROM sources")}
+
+        stats = {"files": 0, "rows": 0}
+        for path in paths:
+            stat = os.stat(path)
+            if known.get(path) == (stat.st_mtime, stat.st_size):
+                continue
+            try:
+                import pandas as pd  # only once some file actually has to be read
+                if path.endswith(".xlsx"):
+                    df = _legacy_frame(path)
+                elif path.endswith(".parquet"):
+                    df = pd.read_parquet(path)
+                else:
+                    df = pd.read_csv(path, dtype=str)
+            except Exception as e:
+                logger.warning(f"Skipping {path}: {e}")
+                continue
+            stats["rows"] += self.add_frame(df)
+            stats["files"] += 1
+            with self._lock:
+                with self._conn:
+                    self._conn.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?)",
+                                       (path, stat.st_mtime, stat.st_size))
+        if stats["files"]:
+            logger.info(f"Party index: {stats['rows']} row(s) from {stats['files']} file(s).")
+        return stats
+
+    def add_frame(self, df) -> int:
+        df = df.dropna(subset=["Parties"])
+        added = 0
+        with self._lock:
+            with self._conn:
+                for bench, appeal, parties, url, order_date in df[COLUMNS + [DATE_COLUMN]].itertuples(index=False):
+                    url_key = normalize_url(url) if isinstance(url, str) else f"{bench}|{appeal}|{order_date}|{parties}"
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO orders VALUES (?, ?, ?, ?, ?, ?)",
+                        (url_key, url if isinstance(url, str) else None, bench, appeal, parties, order_date),
+                    )
+                    if not cursor.rowcount:
+                        continue
+                    added += 1
+                    for side, name in party_names(parties):
+                        self._link_name(name, url_key, side)
+        return added
+
+    def _link_name(self, name, url_key, side):
+        key = Helper._normalize_alphanumeric(name)
+        row = self._conn.execute("SELECT id FROM names WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            cursor = self._conn.execute("INSERT INTO names (key, key_alpha) VALUES (?, ?)",
+                                        (key, Helper._normalize_alpha(name)))
+            self._conn.execute("INSERT INTO name_trigrams (rowid, key) VALUES (?, ?)", (cursor.lastrowid, key))
+            row = (cursor.lastrowid,)
+        self._conn.execute("INSERT OR IGNORE INTO name_orders VALUES (?, ?, ?)", (row[0], url_key, side))
+
+    # ----------------------------
+    # Lookup
+    # ----------------------------
+    def _name_ids(self, query, mode, limit, cutoff):
+        key = Helper._normalize_alphanumeric(query)
+        if not key:
+            return []
+        if mode == "exact":
+            # a query without digits ("pcit") also matches names that only differ by them ("PCIT - 5")
+            if key == Helper._normalize_alpha(query):
+                sql = "SELECT id FROM names WHERE key = ? OR key_alpha = ?"
+                return [r[0] for r in self._conn.execute(sql, (key, key))]
+            return [r[0] for r in self._conn.execute("SELECT id FROM names WHERE key = ?", (key,))]
+        if mode == "prefix":
+            return [r[0] for r in self._conn.execute(
+                "SELECT id FROM names WHERE key >= ? AND key < ? ORDER BY key LIMIT ?", (key, key + "\uffff", limit))]
+        if mode == "contains":
+            if len(key) < 3:
+                return self._name_ids(query, "prefix", limit, cutoff)
+            return [r[0] for r in self._conn.execute(
+                "SELECT rowid FROM name_trigrams WHERE name_trigrams MATCH ? LIMIT ?",
+                ('"' + key.replace('"', "") + '"', limit))]
+
+        # fuzzy: any shared trigram makes a candidate, difflib ranks them
+        trigrams = {key[i:i + 3] for i in range(max(1, len(key) - 2))}
+        expression = " OR ".join('"' + t.replace('"', "") + '"' for t in trigrams if len(t) == 3)
+        if not expression:
+            return self._name_ids(query, "prefix", limit, cutoff)
+        candidates = self._conn.execute(
+            "SELECT n.id, n.key FROM name_trigrams JOIN names n ON n.id = name_trigrams.rowid "
+            "WHERE name_trigrams MATCH ? ORDER BY bm25(name_trigrams) LIMIT ?",
+            (expression, limit * 20),
+        ).fetchall()
+        # a short query is compared with the start of longer names as well as the whole name
+        scored = sorted(((max(difflib.SequenceMatcher(None, key, name).ratio(),
+                              difflib.SequenceMatcher(None, key, name[:len(key)]).ratio()), name_id)
+                         for name_id, name in candidates), reverse=True)
+        return [name_id for score, name_id in scored if score >= cutoff][:limit]
+
+    def search(self, query: str, mode: str = "exact", limit=50, cutoff=0.75) -> list:
+        if mode not in MATCH_MODES:
+            raise ValueError(f"Unknown match mode '{mode}'. Use one of {', '.join(MATCH_MODES)}.")
+        with self._lock:
+            name_ids = self._name_ids(query, mode, limit, cutoff)
+            if not name_ids:
+                return []
+            marks = ",".join("?" * len(name_ids))
+            rows = self._conn.execute(
+                f"SELECT DISTINCT o.order_date, o.bench, o.appeal, o.parties, o.url, x.side "
+                f"FROM name_orders x JOIN orders o ON o.url_key = x.url_key "
+                f"WHERE x.name_id IN ({marks}) LIMIT ?",
+                (*name_ids, limit),
+            ).fetchall()
+        keys = ("order_date", "bench", "appeal", "parties", "url", "side")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
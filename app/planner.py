@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+
+DATE_FORMAT = "%d/%m/%Y"
+RANGE_SEP = ".."
+
+
+def _name_lookup(name_map: dict) -> dict:
+    # {"20": "Mumbai"} -> {"mumbai": 20}
+    return {str(name).strip().lower(): int(index) for index, name in (name_map or {}).items()}
+
+
+def expand_indexes(spec, name_map: dict = None, label: str = "value") -> list:
+    # Accepts 5, "5", "1..18", "Mumbai", "Agra..Chennai", "all" or a list mixing those.
+    lookup = _name_lookup(name_map)
+
+    def resolve(item):
+        if isinstance(item, int):
+            return item
+        text = str(item).strip()
+        if text.isdigit():
+            return int(text)
+        if text.lower() in lookup:
+            return lookup[text.lower()]
+        raise ValueError(f"Unknown {label} '{text}'.")
+
+    items = spec if isinstance(spec, (list, tuple)) else [spec]
+    indexes = []
+    for item in items:
+        if isinstance(item, str) and item.strip().lower() == "all":
+            # index 0 is the "Select ..." placeholder of the dropdown
+            indexes.extend(sorted(i for i in lookup.values() if i > 0))
+        elif isinstance(item, str) and RANGE_SEP in item:
+            start, end = (resolve(part) for part in item.split(RANGE_SEP, 1))
+            if start > end:
+                raise ValueError(f"Empty {label} range '{item}'.")
+            indexes.extend(range(start, end + 1))
+        else:
+            indexes.append(resolve(item))
+    return list(dict.fromkeys(indexes))
+
+
+def expand_dates(spec) -> list:
+    # Accepts "29/09/2025", "01/09/2025..05/09/2025" or a list of those.
+    items = spec if isinstance(spec, (list, tuple)) else [spec]
+    dates = []
+    for item in items:
+        text = str(item).strip()
+        if RANGE_SEP in text:
+            start, end = (datetime.strptime(part.strip(), DATE_FORMAT) for part in text.split(RANGE_SEP, 1))
+            if start > end:
+                raise ValueError(f"Empty date range '{text}'.")
+            dates.extend((start + timedelta(days=n)).strftime(DATE_FORMAT) for n in range((end - start).days + 1))
+        else:
+            dates.append(datetime.strptime(text, DATE_FORMAT).strftime(DATE_FORMAT))
+    return list(dict.fromkeys(dates))
+
+
+def order_jobs(jobs) -> list:
+    # Keep bench and date fixed for as long as possible so consecutive jobs only touch the appeal dropdown.
+    return sorted(jobs, key=lambda job: (datetime.strptime(job[2], DATE_FORMAT), job[0], job[1]))
+
+
+def plan_jobs(cfg: dict) -> list:
+    benches = expand_indexes(cfg["benches"], cfg.get("bench_values"), "bench")
+    appeals = expand_indexes(cfg["appeals"], cfg.get("appeal_values"), "appeal")
+    dates = expand_dates(cfg["dates"])
+    return order_jobs(
+        (bench, appeal, order_date)
+        for bench in benches
+        for appeal in appeals
+        for order_date in dates
+    )
+
+
+def yield_rate(stats: dict, job, prior=(1, 2)) -> float:
+    # Share of earlier runs of this bench/appeal that returned orders; unseen pairs start at 0.5.
+    seen = stats.get((str(job[0]), str(job[1])), {})
+    return (seen.get("hits", 0) + prior[0]) / (seen.get("runs", 0) + prior[1])
+
+
+def _is_low_yield(stats: dict, job, yield_cfg: dict) -> bool:
+    seen = stats.get((str(job[0]), str(job[1])), {})
+    return (seen.get("runs", 0) >= yield_cfg.get("min_runs", 5)
+            and seen.get("hits", 0) / seen["runs"] < yield_cfg.get("skip_below", 0.05))
+
+
+def yield_tier(stats: dict, job, yield_cfg: dict) -> int:
+    # 0 = most likely to return orders; deferred pairs sort after everything else
+    if _is_low_yield(stats, job, yield_cfg):
+        return 100
+    return 10 - int(yield_rate(stats, job) * 10)
+
+
+def prioritize_jobs(jobs, stats: dict, yield_cfg: dict = None):
+    # High-yield bench/appeal pairs first, near-always-empty ones deferred to the end or skipped.
+    # Jobs within a tier keep the date/bench/appeal order so the search form is still reused.
+    yield_cfg = yield_cfg or {}
+    if yield_cfg.get("full_sweep") or not stats:
+        return list(jobs), []
+    skipped = []
+    if yield_cfg.get("low_yield", "defer") == "skip":
+        skipped = [job for job in jobs if _is_low_yield(stats, job, yield_cfg)]
+        jobs = [job for job in jobs if not _is_low_yield(stats, job, yield_cfg)]
+    ordered = sorted(jobs, key=lambda job: (yield_tier(stats, job, yield_cfg),
+                                            datetime.strptime(job[2], DATE_FORMAT), job[0], job[1]))
+    return ordered, skipped
+
+
+def shares_form_state(previous, job) -> bool:
+    return previous is not None and previous[0] == job[0] and previous[2] == job[2]
+
+
+def describe_plan(jobs, cfg: dict, stats: dict = None) -> str:
+    bench_names = cfg.get("bench_values", {})
+    appeal_names = cfg.get("appeal_values", {})
+    lines, previous, reloads = [], None, 0
+    for n, job in enumerate(jobs, 1):
+        bench, appeal, order_date = job
+        reuse = shares_form_state(previous, job)
+        reloads += not reuse
+        lines.append(
+            f"{n:>4}  {order_date}  {bench:>3} {bench_names.get(str(bench), ''):<15} "
+            f"{appeal:>3} {appeal_names.get(str(appeal), ''):<45} {'appeal only' if reuse else 'full form':<11}"
+            + (f"  yield {yield_rate(stats, job):.0%}" if stats else "")
+        )
+        previous = job
+    lines.append(f"{len(jobs)} job(s), {reloads} full form fill(s) on a single worker.")
+    return "\n".join(lines)
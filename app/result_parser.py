@@ -0,0 +1,70 @@
+import re
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup, Comment, NavigableString
+
+
+NO_RECORDS_TEXT = "No Records Found"
+
+# elements that start a new line in innerText; everything else runs on inside the line
+_BLOCK_TAGS = {"address", "article", "blockquote", "dd", "div", "dl", "dt", "footer", "h1", "h2", "h3",
+               "h4", "h5", "h6", "header", "hr", "li", "ol", "p", "pre", "section", "table", "tr", "ul"}
+_SKIPPED_TAGS = {"script", "style", "template", "noscript"}
+_SPACES = re.compile(r"[ \t\r\n\f]+")
+
+
+def inner_text(element) -> str:
+    # Element.innerText.trim() as EXTRACT_ROWS_JS reads it in the browser: <br> and block
+    # boundaries break the line (two for <p>), inline markup runs together and source whitespace
+    # collapses. Ints in `parts` are the line breaks a block boundary asks for; neighbouring
+    # ones merge into the largest and a <br> right next to them already ends the line.
+    parts = []
+
+    def walk(node):
+        for child in node.children:
+            if isinstance(child, Comment):
+                continue
+            if isinstance(child, NavigableString):
+                parts.append(_SPACES.sub(" ", str(child)))
+            elif child.name == "br":
+                parts.append("\n")
+            elif child.name not in _SKIPPED_TAGS:
+                breaks = 2 if child.name == "p" else 1 if child.name in _BLOCK_TAGS else 0
+                parts.append(breaks)
+                walk(child)
+                parts.append(breaks)
+
+    walk(element)
+    text, pending = "", 0
+    for part in parts:
+        if isinstance(part, int):
+            pending = max(pending, part)
+            continue
+        if not part.strip(" ") and (pending or not text or text.endswith("\n")):
+            continue  # indentation between blocks or at the start of a line
+        if pending and text and not text.endswith("\n") and part != "\n":
+            text += "\n" * pending
+        elif pending > 1 and text:
+            text += "\n" * (pending - 1)
+        pending = 0
+        text += part
+    return "\n".join(line.strip(" ") for line in text.split("\n")).strip()
+
+
+def parse_result_rows(html: str, base_url: str = ""):
+    # Same [parties, order_link] pairs as EXTRACT_ROWS_JS, but from raw HTML.
+    soup = BeautifulSoup(html, "lxml")
+    rows = soup.select("#results table tbody tr") or soup.select("table tbody tr")
+
+    parsed = []
+    for tr in rows:
+        no_data = tr.select_one("td[colspan='5']")
+        if no_data and NO_RECORDS_TEXT in no_data.get_text():
+            return []
+        parties = tr.select_one("td:nth-child(2)")
+        link = tr.select_one("td:nth-child(4) a")
+        href = link.get("href") if link else None
+        parsed.append([
+            inner_text(parties) if parties else None,
+            urljoin(base_url, href) if href else None,
+        ])
+    return parsed
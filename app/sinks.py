@@ -0,0 +1,201 @@
+import glob, os, threading, time
+from datetime import datetime
+
+from app.utils import Helper
+from app.logger import get_global_logger
+
+logger = get_global_logger()
+
+COLUMNS = ["Bench", "Appeal", "Parties", "Order Link"]
+DATE_COLUMN = "Order Date"
+
+# pandas is imported where frames are built, so listing dataset files (the party index, the CLI)
+# does not pay for it
+
+
+def with_hyperlinks(df):
+    df = df.copy()
+    df["Order Link"] = '=HYPERLINK("' + df["Order Link"] + '", "' + df["Order Link"] + '")'
+    return df
+
+
+def _iso_date(order_date: str) -> str:
+    return datetime.strptime(order_date, "%d/%m/%Y").strftime("%Y-%m-%d")
+
+
+def to_frame(rows, order_date: str):
+    # one vectorised frame per batch instead of row-by-row formatting
+    import pandas as pd
+    df = pd.DataFrame(rows, columns=COLUMNS)
+    df[DATE_COLUMN] = order_date
+    return df
+
+
+class BaseSink:
+    extension = None
+    # rows are on disk once write_batch returns, so a page can be checkpointed right after it
+    durable = True
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def write_batch(self, rows, order_date: str):
+        if not rows:
+            return
+        df = to_frame(rows, order_date)
+        with self._lock:
+            for (bench, appeal), part in df.groupby(["Bench", "Appeal"], sort=False):
+                self._write(part, bench, appeal, order_date)
+
+    def reset_job(self, bench, appeal, order_date: str):
+        # Called before the first page of a job that starts at page 1: whatever an earlier run of
+        # the job wrote is dropped, so re-scraping replaces its rows instead of adding a copy.
+        with self._lock:
+            self._reset(bench, appeal, order_date)
+
+    def finish_job(self, bench, appeal, order_date: str, append: bool = False) -> str:
+        # append=True when the job resumed part-way, so earlier pages are already on disk
+        return self.partition_dir(bench, order_date)
+
+    def partition_dir(self, bench, order_date: str) -> str:
+        return Helper.create_dir(self.root, f"date={_iso_date(order_date)}",
+                                 f"bench={Helper.sanitize_Win_filename(str(bench))}")
+
+    def _write(self, df, bench, appeal, order_date):
+        raise NotImplementedError
+
+    def _reset(self, bench, appeal, order_date):
+        raise NotImplementedError
+
+    def _job_prefix(self, bench, appeal, order_date) -> str:
+        # partition path + file name stem of a job, without creating the partition
+        return os.path.join(self.root, f"date={_iso_date(order_date)}",
+                            f"bench={Helper.sanitize_Win_filename(str(bench))}",
+                            Helper.sanitize_Win_filename(str(appeal)))
+
+    def close(self):
+        pass
+
+
+class CsvSink(BaseSink):
+    # one CSV per appeal inside date=/bench= partitions, appended to page by page
+    extension = ".csv"
+
+    def _write(self, df, bench, appeal, order_date):
+        self.partition_dir(bench, order_date)
+        path = self._job_prefix(bench, appeal, order_date) + ".csv"
+        df.to_csv(path, mode="a", index=False, header=not os.path.exists(path), encoding="utf-8")
+
+    def _reset(self, bench, appeal, order_date):
+        try:
+            os.remove(self._job_prefix(bench, appeal, order_date) + ".csv")
+        except FileNotFoundError:
+            pass
+
+
+class ParquetSink(BaseSink):
+    # Parquet files cannot be appended to, so every batch becomes its own part file
+    extension = ".parquet"
+
+    def __init__(self, root: str):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError("The parquet sink needs pyarrow: pip install pyarrow") from e
+        super().__init__(root)
+
+    def _write(self, df, bench, appeal, order_date):
+        self.partition_dir(bench, order_date)
+        df.to_parquet(f"{self._job_prefix(bench, appeal, order_date)}-{time.time_ns()}.parquet", index=False)
+
+    def _reset(self, bench, appeal, order_date):
+        prefix = self._job_prefix(bench, appeal, order_date)
+        for path in glob.glob(glob.escape(prefix) + "-*.parquet"):
+            if path[len(prefix) + 1:-len(".parquet")].isdigit():  # not another appeal's "<name>-..." parts
+                os.remove(path)
+
+
+class ExcelSink(BaseSink):
+    # Legacy layout: one <Bench>_<Appeal>_<ddmmyyyy>.xlsx per job, written when the job finishes.
+    # Pages only sit in memory until then, so they are not checkpointed and a crashed job starts over.
+    durable = False
+
+    def __init__(self, root: str, suffix: str = ""):
+        super().__init__(root)
+        self.suffix = suffix
+        self._buffers = {}
+
+    def _write(self, df, bench, appeal, order_date):
+        self._buffers.setdefault((bench, appeal, order_date), []).append(df)
+
+    def _reset(self, bench, appeal, order_date):
+        # the workbook itself is rewritten by finish_job(append=False)
+        self._buffers.pop((bench, appeal, order_date), None)
+
+    def finish_job(self, bench, appeal, order_date: str, append: bool = False) -> str:
+        with self._lock:
+            frames = self._buffers.pop((bench, appeal, order_date), None)
+        if not frames:
+            return None
+        import pandas as pd
+        ref_date = datetime.strptime(order_date, "%d/%m/%Y").strftime("%d%m%Y")
+        out_path = Helper.create_dir(self.root, f"{ref_date}_DATA")
+        file_path = os.path.join(out_path, f"{bench}_{appeal}_{ref_date}{self.suffix}.xlsx")
+        df = with_hyperlinks(pd.concat(frames, ignore_index=True)[COLUMNS])
+        if append and os.path.exists(file_path):
+            # pandas reads the HYPERLINK formulas back as NaN, so append the rows with openpyxl
+            from openpyxl import load_workbook
+            workbook = load_workbook(file_path)
+            for row in df.itertuples(index=False):
+                workbook.active.append(list(row))
+            workbook.save(file_path)
+        else:
+            df.to_excel(file_path, index=False)
+        return file_path
+
+
+def build_sink(output_dir: str, fmt: str = "csv", delta: bool = False):
+    if fmt == "excel":
+        return ExcelSink(output_dir, suffix="_delta" if delta else "")
+    root = os.path.join(output_dir, "dataset_delta" if delta else "dataset")
+    if fmt == "parquet":
+        return ParquetSink(root)
+    if fmt == "csv":
+        return CsvSink(root)
+    raise ValueError(f"Unknown sink format '{fmt}'. Use csv, parquet or excel.")
+
+
+def dataset_files(root: str, order_date: str = None, bench=None) -> list:
+    date_part = f"date={_iso_date(order_date)}" if order_date else "date=*"
+    bench_part = f"bench={Helper.sanitize_Win_filename(str(bench))}" if bench is not None else "bench=*"
+    pattern = os.path.join(root, date_part, bench_part, "*")
+    return sorted(p for p in glob.glob(pattern) if p.endswith((".csv", ".parquet")))
+
+
+def load_dataset(root: str, order_date: str = None, bench=None):
+    import pandas as pd
+    frames = [
+        pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path, dtype=str)
+        for path in dataset_files(root, order_date, bench)
+    ]
+    if not frames:
+        return pd.DataFrame(columns=COLUMNS + [DATE_COLUMN])
+    return pd.concat(frames, ignore_index=True)
+
+
+def export_excel(root: str, output_dir: str, order_date: str, bench=None, enrich=False) -> str:
+    # Excel on demand: consolidate one day of the dataset into a single workbook.
+    # enrich=True adds the parsed appellant/respondent columns from Helper.enrich_parties.
+    df = load_dataset(root, order_date, bench)
+    if df.empty:
+        logger.info(f"Nothing in the dataset for {order_date}.")
+        return None
+    ref_date = datetime.strptime(order_date, "%d/%m/%Y").strftime("%d%m%Y")
+    out_path = Helper.create_dir(output_dir, f"{ref_date}_DATA")
+    name = f"{bench}_{ref_date}.xlsx" if bench is not None else f"ALL_{ref_date}.xlsx"
+    file_path = os.path.join(out_path, name)
+    df = Helper.enrich_parties(df) if enrich else df[COLUMNS]
+    with_hyperlinks(df.drop(columns=[DATE_COLUMN], errors="ignore")).to_excel(file_path, index=False)
+    logger.info(f"Exported {len(df)} row(s) to {file_path}.")
+    return file_path
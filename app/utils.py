@@ -2,6 +2,30 @@ import os, re, json, string, random
 from datetime import datetime
 import unicodedata
 
+# compiled once at import; the normalisers run once per scraped row
+_NUMERIC = re.compile(r'[+-]?(\d+(\.\d*)?|\.\d+)')
+_ALPHANUMERIC = re.compile(r'[A-Za-z0-9]+')
+_ALPHA = re.compile(r'[A-Za-z]+')
+_WHITESPACE = re.compile(r"\s+")
+_NON_ALPHANUMERIC = re.compile(r"[^a-zA-Z0-9]+")
+_NON_ALPHA = re.compile(r"[^a-zA-Z]+")
+_NON_NUMERIC = re.compile(r"[^0-9\.]+")
+_WIN_FILENAME = re.compile(r'[<>:"/\\|?*]')
+
+# "APPELLANT,CITY\nVS.\nRESPONDENT,CITY" as shown in the results table
+PARTY_SPLIT = re.compile(r"\s+VS\.?\s+", re.IGNORECASE)
+# honorifics in front of a name and the trailing ", CITY" segment, dropped in one pass
+_PARTY_NOISE = re.compile(r"^\s*(?:M/S\.?|MESSRS\.?|SHRI\.?|SMT\.?|MR\.?|MRS\.?|MS\.?)\s+|\s*,[^,]*$")
+_PARTY_ABBREVIATION = re.compile(r"\b(PVT|LTD|DY|ASST|ADDL|PR)\b\.?|\b(CO)\b\.(?=\s|$)")
+_PARTY_ABBREVIATIONS = {"PVT": "PRIVATE", "LTD": "LIMITED", "DY": "DEPUTY", "ASST": "ASSISTANT",
+                        "ADDL": "ADDITIONAL", "PR": "PRINCIPAL", "CO": "CO"}
+# assessing officers and the department itself; these sit on the Revenue side of an appeal
+REVENUE_PARTY = re.compile(
+    r"\b(?:P?CIT|ACIT|DCIT|JCIT|ADDL\.?\s*CIT|ITO|DIT|ADIT|DDIT|CCIT|"
+    r"INCOME[\s-]+TAX[\s-]+OFFICER|ASSESSING\s+OFFICER|(?:\w+\.?\s+)?COMMISSIONER\s+OF\s+INCOME[\s-]+TAX|"
+    r"DIRECTOR\s+OF\s+INCOME[\s-]+TAX|INCOME[\s-]+TAX\s+DEPARTMENT|UNION\s+OF\s+INDIA)\b"
+)
+
 
 class Helper:
     # ----------------------------
@@ -98,40 +122,38 @@ class Helper:
     # ----------------------------
     @staticmethod
     def is_numeric(text):
-        return bool(re.fullmatch(r'[+-]?(\d+(\.\d*)?|\.\d+)', text))
+        return bool(_NUMERIC.fullmatch(text))
 
     @staticmethod
     def is_alphanumeric(text):
-        return bool(re.fullmatch(r'[A-Za-z0-9]+', text))
+        return bool(_ALPHANUMERIC.fullmatch(text))
 
     @staticmethod
     def is_alpha(text):
-        return bool(re.fullmatch(r'[A-Za-z]+', text))
+        return bool(_ALPHA.fullmatch(text))
 
     @staticmethod
     def _normalize_whitespace(text: str) -> str:
-        return re.sub(r"\s+", " ", text).strip() if isinstance(text, str) else text
+        return _WHITESPACE.sub(" ", text).strip() if isinstance(text, str) else text
     
     @staticmethod
     def _normalize_alphanumeric(text: str) -> str:
         if not isinstance(text, str):
             return text
-        text = re.sub(r"[^a-zA-Z0-9]+", " ", str(text))
-        return re.sub(r"\s+", " ", text).strip().lower()
+        # the separator run already swallows any whitespace, so one pass is enough
+        return _NON_ALPHANUMERIC.sub(" ", text).strip().lower()
     
     @staticmethod
     def _normalize_alpha(text: str) -> str:
         if not isinstance(text, str):
             return text
-        text = re.sub(r"[^a-zA-Z]+", " ", str(text))
-        return re.sub(r"\s+", " ", text).strip().lower()
+        return _NON_ALPHA.sub(" ", text).strip().lower()
 
     @staticmethod
     def _normalize_numeric(text: str) -> str:
         if not isinstance(text, str):
             return text
-        text = re.sub(r"[^0-9\.]+", " ", str(text))
-        return re.sub(r"\s+", " ", text).strip().lower()
+        return _NON_NUMERIC.sub(" ", text).strip().lower()
 
     @staticmethod
     def snake_case(text: str) -> str:
@@ -146,7 +168,7 @@ class Helper:
 
     @staticmethod
     def sanitize_Win_filename(name):
-        return re.sub(r'[<>:"/\\|?*]', '_', name)
+        return _WIN_FILENAME.sub('_', name)
 
     @staticmethod
     def fix_mojibake(text: str) -> str:
@@ -156,6 +178,42 @@ class Helper:
             return text
 
 
+    # ----------------------------
+    # Party Parsing (whole pandas columns at once)
+    # ----------------------------
+    @staticmethod
+    def normalize_alphanumeric_series(series):
+        # column version of _normalize_alphanumeric
+        return series.str.replace(_NON_ALPHANUMERIC, " ", regex=True).str.strip().str.lower()
+
+    @staticmethod
+    def canonical_party_series(series):
+        # "M/S. ABC PVT. LTD.,MUMBAI" -> "ABC PRIVATE LIMITED"
+        names = series.str.upper().str.replace(_PARTY_NOISE, "", regex=True)
+        names = names.str.replace(_PARTY_ABBREVIATION, lambda m: _PARTY_ABBREVIATIONS[m.group(1) or m.group(2)], regex=True)
+        return names.str.replace(_WHITESPACE, " ", regex=True).str.strip(" ,.-")
+
+    @staticmethod
+    def enrich_parties(df, column="Parties"):
+        # Adds Appellant/Respondent, their canonical names and keys, and Revenue flags.
+        # The same officer/assessee text repeats across orders, so every distinct value is
+        # parsed once and the results are broadcast back with take().
+        import pandas as pd
+        codes, uniques = df[column].factorize(use_na_sentinel=False)
+        sides = pd.Series(uniques, dtype=object).str.split(PARTY_SPLIT, n=1, expand=True, regex=True)
+        sides = sides.reindex(columns=[0, 1]).take(codes)
+
+        parsed = [df]
+        for label, raw in (("Appellant", sides[0]), ("Respondent", sides[1])):
+            side_codes, side_uniques = raw.factorize(use_na_sentinel=False)
+            names = pd.Series(side_uniques, dtype=object)
+            side = pd.DataFrame({label: Helper.canonical_party_series(names)})
+            side[f"{label} Key"] = Helper.normalize_alphanumeric_series(side[label])
+            side[f"{label} Is Revenue"] = names.str.upper().str.contains(REVENUE_PARTY, regex=True).fillna(False).astype(bool)
+            parsed.append(side.take(side_codes).set_axis(df.index))
+        return pd.concat(parsed, axis=1)
+
+
     # ----------------------------
     # List Utilities
     # ----------------------------
@@ -1,21 +1,32 @@
 import time
-import pandas as pd
+from typing import NamedTuple
 # from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
-# from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import TimeoutException, NoAlertPresentException, UnexpectedAlertPresentException
 
 from app.constant import *
-from app.logger import get_global_logger
+from app.http_pager import HttpResultPager
+from app.logger import get_global_logger, timed
 
 logger = get_global_logger()
 
+
+class ResultPage(NamedTuple):
+    page_num: int
+    total_pages: int
+    rows: list  # [bench, appeal, parties, order_link]
+    html: str = None  # the raw results markup, when iter_result_pages was asked to capture it
+    url: str = None
+
+
 class TribunalWebScraper:
     def __init__(self, driver):
         self.driver = driver
         self.wait = WebDriverWait(driver, DEFAULT_WAIT_TIME)
         
+    @timed("dropdowns")
     def set_search_options(self, bench_index: int, appeal_index: int, date: str):
         try:
             bench_name = self._select_dropdown_option(BENCH_SELECT, bench_index, "Bench")
@@ -27,20 +38,37 @@ class TribunalWebScraper:
             logger.error(f"Failed to set search options: {e}")
             raise
 
+    def form_present(self):
+        return bool(self.driver.find_elements(By.ID, BENCH_SELECT))
+
+    @timed("accordion")
+    def open_search_panel(self):
+        # the accordion toggles, so only click it while the dropdowns are hidden
+        dropdowns = self.driver.find_elements(By.ID, BENCH_SELECT)
+        if dropdowns and dropdowns[0].is_displayed():
+            return
+        accordion_btn = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, HEADING_BUTTON)))
+        self.driver.execute_script("arguments[0].click();", accordion_btn)
+
     def _select_dropdown_option(self, element_id, index, label):
         dropdown = self.wait.until(EC.visibility_of_element_located((By.ID, element_id)))
         select = Select(dropdown)
         if index >= len(select.options):
             raise ValueError(f"{label} index {index} out of range.")
-        select.select_by_index(index)
+        # leave the dropdown alone when the previous job already picked this option
+        if select.first_selected_option.get_attribute("index") != str(index):
+            select.select_by_index(index)
         return select.first_selected_option.text
 
     def _set_date(self, date):
         date_input = self.wait.until(EC.visibility_of_element_located((By.ID, DATE_SELECT)))
+        if date_input.get_attribute("value") == date:
+            return
         self.driver.execute_script("arguments[0].removeAttribute('readonly')", date_input)
         self.driver.execute_script("arguments[0].value = arguments[1];", date_input, date)
         self.driver.execute_script("arguments[0].dispatchEvent(new Event('change'));", date_input)
 
+    @timed("captcha_audio")
     def get_captcha_audio(self):
         audio_btn = self.driver.find_element(By.XPATH, AUDIO_PLAY_BUTTON)
         self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", audio_btn)
@@ -52,20 +80,52 @@ class TribunalWebScraper:
         time.sleep(.5)
         return self.driver.find_element(By.ID, AUDIO_SOURCE).get_attribute("src")
 
+    @timed("captcha_image")
+    def get_captcha_image(self):
+        try:
+            return self.driver.find_element(By.XPATH, CAPTCHA_IMAGE).screenshot_as_png
+        except Exception as e:
+            logger.warning(f"Could not capture captcha image: {e}")
+            return None
+
+    @timed("captcha_refresh")
     def refresh_captcha(self):
-        refresh_btn = self.driver.find_element(By.XPATH, AUDIO_PLAY_BUTTON)
+        refresh_btn = self.driver.find_element(By.XPATH, CAPTCHA_REFRESH)
         self._click_element(refresh_btn)
         time.sleep(.5)
 
+    @timed("submit")
     def submit_captcha(self, captcha_text: str):
         captcha_input = self.driver.find_element(By.ID, CAPTCHA_ID)
         captcha_input.clear()
         logger.info(f"Sending Text: {captcha_text}")
         captcha_input.send_keys(captcha_text)
         submit_btn = self.driver.find_element(By.ID, SUBMIT_CAPTCHA_BUTTON)
-        time.sleep(1)
+        # tag any table from a previous search so it cannot be mistaken for this submit's results
+        self.driver.execute_script(MARK_RESULTS_STALE_JS)
         self._click_element(submit_btn)
 
+    @timed("alert_wait")
+    def wait_for_alert_or_results(self, timeout=DEFAULT_WAIT_TIME):
+        # Returns ("alert", alert), ("results", None) or ("timeout", None) as soon as one of them happens.
+        def outcome(driver):
+            try:
+                return "alert", driver.switch_to.alert
+            except NoAlertPresentException:
+                pass
+            try:
+                if driver.execute_script(RESULTS_READY_JS):
+                    return "results", None
+            except UnexpectedAlertPresentException:
+                # the alert popped up between the two checks, pick it up on the next poll
+                pass
+            return False
+
+        try:
+            return WebDriverWait(self.driver, timeout, poll_frequency=SUBMIT_POLL_INTERVAL).until(outcome)
+        except TimeoutException:
+            return "timeout", None
+
     def _click_element(self, element):
         self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
         self.driver.execute_script("arguments[0].click();", element)
@@ -82,8 +142,25 @@ class TribunalWebScraper:
             logger.error(f"Error checking results: {e}")
             return False
 
-    def scrape_results(self, bench_name, appeal_name):
-        logger.info("Page Loaded.")
+    @timed("extract_rows")
+    def _extract_rows(self):
+        # one WebDriver round-trip per page instead of three per row
+        return self.driver.execute_script(EXTRACT_ROWS_JS) or []
+
+    def _results_html(self):
+        return self.driver.execute_script(RESULTS_HTML_JS), self.driver.current_url
+
+    def _page_batch(self, rows, bench_name, appeal_name, page_num, total_pages, source=(None, None)):
+        batch = [
+            [bench_name, appeal_name, parties, order_link]
+            for parties, order_link in rows
+            if parties is not None and order_link
+        ]
+        logger.info(f"Rows on page {page_num}: {len(rows)} | new added: {len(batch)}")
+        return ResultPage(page_num, total_pages, batch, *source)
+
+    def _wait_for_first_page(self):
+        # Total page count, or 0 when there is nothing to scrape.
         try:
             self.wait.until(lambda d: (
                 d.find_elements(By.CSS_SELECTOR, "#results table tbody tr td[colspan='5']")
@@ -91,55 +168,65 @@ class TribunalWebScraper:
             ))
         except Exception:
             logger.warning("Results table did not load.")
-            return None
+            return 0
 
         no_data_cells = self.driver.find_elements(By.CSS_SELECTOR, "#results table tbody tr td[colspan='5']")
         if no_data_cells and "No Records Found" in no_data_cells[0].text:
             logger.warning("No records found. Skipping pagination.")
-            return None
+            return 0
 
         page_buttons = self.driver.find_elements(By.XPATH, PAGE_BTN_XPATH)
         max_pages = len(page_buttons) if page_buttons else 1
         logger.info(f"Total Pages are {max_pages}.")
+        return max_pages
+
+    @timed("page_change")
+    def _open_page(self, page_num):
+        page_btn = self.driver.find_element(By.XPATH, f"//input[@name='btnPage' and @value='{page_num}']")
+        self.driver.execute_script("arguments[0].scrollIntoView(true);", page_btn)
+
+        if page_btn.get_attribute("disabled"):
+            logger.info(f"Skipping page {page_num} (already active).")
+            return
+        self.driver.execute_script(MARK_RESULTS_STALE_JS)
+        self.driver.execute_script("arguments[0].click();", page_btn)
+        logger.info(f"-> Clicked page {page_num}")
+        self.wait.until(lambda d: d.execute_script(RESULTS_READY_JS))
+
+    def iter_result_pages(self, bench_name, appeal_name, pagination=None, start_page=1, capture_html=False):
+        # Yields one ResultPage per page, in order, starting at start_page.
+        # A page that cannot be read ends the iteration with an exception, so callers that
+        # checkpoint after every yielded page can resume from the failed page later.
+        # capture_html also returns each page's markup (for the page cache).
+        logger.info("Page Loaded.")
+        max_pages = self._wait_for_first_page()
+        if not max_pages or start_page > max_pages:
+            return
 
-        data, seen_links = [], set()
+        pager = None
+        if (pagination or {}).get("mode") == "http" and max_pages > 1:
+            pager = HttpResultPager.from_driver(self.driver, pagination)
 
-        for page_num in range(1, max_pages + 1):
+        if pager is not None:
+            pager.keep_html = capture_html
+            try:
+                if start_page == 1:
+                    # page 1 is already rendered in the browser, the rest come straight from the server
+                    source = self._results_html() if capture_html else (None, None)
+                    yield self._page_batch(self._extract_rows(), bench_name, appeal_name, 1, max_pages, source)
+                for page_num, rows in pager.iter_pages(range(max(start_page, 2), max_pages + 1)):
+                    source = pager.html.pop(page_num, (None, None))
+                    yield self._page_batch(rows, bench_name, appeal_name, page_num, max_pages, source)
+            finally:
+                pager.close()
+            return
+
+        for page_num in range(start_page, max_pages + 1):
             try:
-                page_btn = self.driver.find_element(By.XPATH, f"//input[@name='btnPage' and @value='{page_num}']")
-                self.driver.execute_script("arguments[0].scrollIntoView(true);", page_btn)
-
-                if page_btn.get_attribute("disabled"):
-                    logger.info(f"Skipping page {page_num} (already active).")
-                else:
-                    self.driver.execute_script("arguments[0].click();", page_btn)
-                    logger.info(f"-> Clicked page {page_num}")
-                    self.wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "#results table tbody tr")))
-                    # time.sleep(1.5)
-
-                rows = self.driver.find_elements(By.CSS_SELECTOR, "#results table tbody tr")
-                page_new_count = 0
-
-                for row in rows:
-                    try:
-                        parties = row.find_element(By.CSS_SELECTOR, "td:nth-child(2)").text.strip()
-                        order_link = row.find_element(By.CSS_SELECTOR, "td:nth-child(4) a").get_attribute("href")
-                        if order_link: #and order_link not in seen_links
-                            # seen_links.add(order_link)
-                            data.append([bench_name, appeal_name, parties, order_link])
-                            page_new_count += 1
-                    except Exception:
-                        continue
-
-                logger.info(f"Rows on page {page_num}: {len(rows)} | new added: {page_new_count}")
+                self._open_page(page_num)
+                rows = self._extract_rows()
+                source = self._results_html() if capture_html else (None, None)
             except Exception as e:
                 logger.warning(f"Failed to process page {page_num}: {e}")
-                continue
-
-        if data:
-            df = pd.DataFrame(data, columns=["Bench", "Appeal", "Parties", "Order Link"])
-            df["Order Link"] = df["Order Link"].apply(lambda url: f'=HYPERLINK("{url}", "{url}")')
-            logger.info(f"Scraped Data Preview:\n{df.head(5)}")
-            df.head(10)
-            return df
-        return None
\ No newline at end of file
+                raise
+            yield self._page_batch(rows, bench_name, appeal_name, page_num, max_pages, source)
@@ -0,0 +1,237 @@
+import threading, time
+
+from app.planner import shares_form_state
+from app.driver_supervisor import DriverSupervisor, is_session_error
+from app.logger import get_global_logger, set_span_job, span
+from app.job_ledger import job_key
+
+logger = get_global_logger()
+
+
+class JobQueue:
+    # Hands each worker the next job that keeps its bench and date, so only the appeal changes.
+    # With a tier function (see planner.yield_tier) that preference never jumps ahead of a
+    # better tier, so deferred low-yield jobs still run last.
+
+    def __init__(self, jobs=(), tier=None):
+        self._jobs = list(jobs)
+        self._tier = tier
+        self._unfinished = len(self._jobs)
+        self._requeued = {}
+        self._closed = False
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+    def put(self, jobs, tier=None):
+        with self._lock:
+            self._jobs.extend(jobs)
+            self._tier = tier
+            self._unfinished += len(jobs)
+            self._changed.notify_all()
+
+    def take(self, previous=None, block=False):
+        # block=True waits for the next put() instead of returning None (warm pool)
+        with self._lock:
+            while block and not self._jobs and not self._closed:
+                self._changed.wait()
+            if not self._jobs:
+                return None
+            front = self._tier(self._jobs[0]) if self._tier else None
+            for i, job in enumerate(self._jobs):
+                if self._tier and self._tier(job) != front:
+                    break
+                if shares_form_state(previous, job):
+                    return self._jobs.pop(i)
+            return self._jobs.pop(0)
+
+    def requeue(self, job):
+        # back to the front of the queue, e.g. after its browser died mid-job
+        with self._lock:
+            self._jobs.insert(0, job)
+            self._requeued[job] = self._requeued.get(job, 0) + 1
+            self._unfinished += 1
+            self._changed.notify_all()
+
+    def requeue_count(self, job) -> int:
+        with self._lock:
+            return self._requeued.get(job, 0)
+
+    def task_done(self):
+        with self._lock:
+            self._unfinished -= 1
+            self._changed.notify_all()
+
+    def join(self, timeout=None) -> bool:
+        # True once every job put so far has been taken and finished
+        with self._lock:
+            return self._changed.wait_for(lambda: self._unfinished <= 0, timeout)
+
+    def clear(self):
+        with self._lock:
+            self._unfinished -= len(self._jobs)
+            self._jobs = []
+            self._changed.notify_all()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._changed.notify_all()
+
+    def qsize(self):
+        with self._lock:
+            return len(self._jobs)
+
+
+class ScraperWorker(threading.Thread):
+    # one browser + one TribunalWebScraper, pulling jobs until the queue is drained
+    def __init__(self, worker_id, jobs, results, job_fn, cfg, ledger=None, persistent=False):
+        super().__init__(name=f"worker-{worker_id}", daemon=True)
+        self.persistent = persistent
+        self.jobs = jobs
+        self.results = results
+        self.job_fn = job_fn
+        self.cfg = cfg
+        self.ledger = ledger
+        self.supervisor = None
+        self.jobs_done = 0
+
+    def run(self):
+        supervisor = self.supervisor = DriverSupervisor(self.cfg, self.name)
+        try:
+            supervisor.start()
+        except Exception as e:
+            logger.error(f"Could not start browser: {e}")
+            return
+
+        previous = None
+        try:
+            while True:
+                try:
+                    job = self.jobs.take(previous, block=self.persistent)
+                except Exception as e:
+                    # only a RemoteJobQueue fails here: the coordinator could not be reached
+                    logger.error(f"Could not take a job, stopping {self.name}: {e}")
+                    break
+                if job is None:
+                    break
+                try:
+                    if supervisor.before_job():
+                        previous = None
+                    result = self._run_job(supervisor, job)
+                except Exception as e:
+                    # the browser could not be (re)started; hand the job to another worker and stop
+                    logger.error(f"Browser restart failed, stopping {self.name}: {e}")
+                    self.jobs.requeue(job)
+                    break
+                finally:
+                    self.jobs.task_done()
+                if result is None:
+                    previous = None
+                    continue
+                self.results.append(result)
+                self.jobs_done += 1
+                previous = job
+        finally:
+            supervisor.quit()
+            logger.info(f"Driver quit after {self.jobs_done} job(s), {supervisor.restarts} restart(s).")
+
+    def _run_job(self, supervisor, job):
+        # Returns None when the browser died under the job: it is restarted and the job requeued.
+        logger.info("========== New Run ==========")
+        if self.ledger is not None:
+            self.ledger.mark_running(job, self.name)
+        set_span_job(job_key(job))
+        start = time.perf_counter()
+        try:
+            with span("job"):
+                result = self.job_fn(supervisor.scraper, *job, self.cfg) or {}
+        except Exception as e:
+            max_requeues = self.cfg.get("supervisor", {}).get("max_requeues", 2)
+            if is_session_error(e) and self.jobs.requeue_count(job) < max_requeues:
+                logger.warning(f"Browser session lost during {job}, requeueing it: {e}")
+                supervisor.restart("session lost")
+                self.jobs.requeue(job)
+                return None
+            logger.error(f"Job {job} crashed: {e}")
+            result = {"status": "failed", "error": str(e)}
+        supervisor.after_job()
+        result.update(job=job, worker=self.name, seconds=round(time.perf_counter() - start, 2))
+        if self.ledger is not None:
+            self.ledger.record(job, result)
+        return result
+
+
+class BrowserPool:
+    def __init__(self, cfg, size=None, ledger=None):
+        self.cfg = cfg
+        self.size = max(1, int(size or cfg.get("workers", 1)))
+        self.ledger = ledger
+        self._queue = None
+        self._workers = []
+        self._results = []
+
+    def run(self, jobs, job_fn, tier=None):
+        return self.run_queue(JobQueue(jobs, tier), job_fn)
+
+    def run_queue(self, job_queue, job_fn):
+        # any object with JobQueue's take/requeue/task_done/qsize, e.g. coordinator.RemoteJobQueue
+        results = []
+        # never start more browsers than there are jobs
+        workers = [
+            ScraperWorker(i + 1, job_queue, results, job_fn, self.cfg, self.ledger)
+            for i in range(min(self.size, job_queue.qsize()))
+        ]
+        logger.info(f"Starting {len(workers)} worker(s) for {job_queue.qsize()} job(s).")
+
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self._log_results(results, time.perf_counter() - start)
+        return results
+
+    # ----------------------------
+    # Warm pool (daemon): browsers stay open between submit() calls until stop()
+    # ----------------------------
+    def start(self, job_fn):
+        self._queue = JobQueue()
+        self._workers = [
+            ScraperWorker(i + 1, self._queue, self._results, job_fn, self.cfg, self.ledger, persistent=True)
+            for i in range(self.size)
+        ]
+        for worker in self._workers:
+            worker.start()
+        logger.info(f"Started {len(self._workers)} warm worker(s).")
+
+    def submit(self, jobs, tier=None) -> list:
+        # blocks until this batch is done
+        done = len(self._results)
+        start = time.perf_counter()
+        self._queue.put(jobs, tier)
+        while not self._queue.join(timeout=5):
+            if not self.alive():
+                logger.error(f"No browser is running, dropping {self._queue.qsize()} job(s).")
+                self._queue.clear()
+                break
+        results = self._results[done:]
+        self._log_results(results, time.perf_counter() - start)
+        return results
+
+    def alive(self) -> int:
+        return sum(worker.is_alive() for worker in self._workers)
+
+    def stop(self, timeout=30):
+        # queued jobs are dropped; a job in progress gets `timeout` seconds to finish
+        if self._queue is not None:
+            self._queue.clear()
+            self._queue.close()
+        for worker in self._workers:
+            worker.join(timeout)
+
+    def _log_results(self, results, elapsed):
+        logger.info(f"Pool finished {len(results)} job(s) in {elapsed:.1f}s.")
+        for result in results:
+            logger.info(f"[{result['worker']}] {result['job']} -> {result.get('status')} "
+                        f"({result.get('rows', 0)} rows, {result['seconds']}s)")
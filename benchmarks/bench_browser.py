@@ -0,0 +1,72 @@
+# Browser start-up benchmark: default vs lean Chrome profile.
+#
+#   python -m benchmarks.bench_browser --jobs 5 --headless
+#
+# Reports driver cold start, first page load and per-job latency (navigate + accordion +
+# dropdowns + date, i.e. everything a job does before the CAPTCHA) for each profile.
+import argparse, copy, statistics, time
+
+from app.constant import CONFIG
+from app.browser import build_driver
+from app.planner import plan_jobs
+from app.web_scraper import TribunalWebScraper
+
+
+def _bench_profile(cfg, profile, jobs, reuse_form):
+    cfg = copy.deepcopy(cfg)
+    cfg.setdefault("browser", {})["profile"] = profile
+
+    start = time.perf_counter()
+    driver = build_driver(cfg, profile_name=f"bench-{profile}")
+    cold_start = time.perf_counter() - start
+
+    try:
+        start = time.perf_counter()
+        driver.get(cfg["url"])
+        first_load = time.perf_counter() - start
+
+        scraper = TribunalWebScraper(driver)
+        job_times = []
+        for bench, appeal, order_date in jobs:
+            start = time.perf_counter()
+            if not (reuse_form and scraper.form_present()):
+                driver.get(cfg["url"])
+            scraper.open_search_panel()
+            scraper.set_search_options(bench, appeal, order_date)
+            job_times.append(time.perf_counter() - start)
+    finally:
+        driver.quit()
+
+    return {
+        "profile": profile,
+        "cold_start": cold_start,
+        "first_load": first_load,
+        "job_p50": statistics.median(job_times),
+        "job_max": max(job_times),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Default vs lean Chrome profile start-up benchmark")
+    parser.add_argument("--url", default=CONFIG["url"], help="page to load (e.g. the local fixture site)")
+    parser.add_argument("--jobs", type=int, default=5, help="jobs per profile")
+    parser.add_argument("--headless", action="store_true")
+    parser.add_argument("--reuse-form", action="store_true", help="measure with reuse_form on")
+    args = parser.parse_args()
+
+    cfg = copy.deepcopy(CONFIG)
+    cfg["url"] = args.url
+    if args.headless:
+        cfg.setdefault("browser", {})["headless"] = True
+    jobs = plan_jobs(cfg)[:args.jobs]
+
+    results = [_bench_profile(cfg, profile, jobs, args.reuse_form) for profile in ("default", "lean")]
+
+    print(f"{'profile':<10}{'cold start':>12}{'first load':>12}{'job p50':>10}{'job max':>10}")
+    for r in results:
+        print(f"{r['profile']:<10}{r['cold_start']:>11.2f}s{r['first_load']:>11.2f}s"
+              f"{r['job_p50']:>9.2f}s{r['job_max']:>9.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# Submits per accepted CAPTCHA: the old single-answer path vs CaptchaVoter.
+#
+#   python -m benchmarks.bench_captcha_voting --captchas 5000 --audio-error 0.08 --ocr-error 0.12
+#
+# Offline simulation: each reader gets every character right with probability 1 - error and
+# otherwise hears/sees a look-alike (or a random character); its confidence is higher when it
+# is right. A wrong submit costs --reload seconds (alert + refresh + form), a CAPTCHA refresh
+# costs --refresh seconds and an operator answer --manual seconds. The policies are:
+#   single   the solver's answer is submitted when confidence >= threshold (pre-voting main.py)
+#   vote     CaptchaVoter on the audio only, refreshing low-scoring CAPTCHAs
+#   vote+ocr CaptchaVoter on audio and OCR
+# A CAPTCHA that is still below the threshold goes to the operator (the "manual" column).
+#
+# At the default threshold (0.8), all three policies submit about once per job: 1.00 for single
+# and vote, 1.02 for vote+ocr at 0.985 acceptance. What voting saves is operator answers and
+# time: 3753 manual answers and 6.00 s/job for single, 488 and 1.32 s/job for vote+ocr. A lower
+# threshold makes voting submit more often than single (1.21 vs 1.13 submits/job at 0.6),
+# because its 0.6-0.8 band is accepted only 50-66% of the time.
+import argparse, random, string
+
+from app.captcha_voting import CaptchaConstraints, CaptchaStats, CaptchaVoter, Candidate, rank_candidates, _LOOKALIKES
+
+CHARSET = string.ascii_uppercase + string.digits
+
+
+def _read(rng, answer, error):
+    wrong = 0
+    chars = []
+    for char in answer:
+        if rng.random() < error:
+            wrong += 1
+            chars.append(rng.choice(_LOOKALIKES.get(char, CHARSET)) if rng.random() < 0.7 else rng.choice(CHARSET))
+        else:
+            chars.append(char)
+    confidence = rng.uniform(0.55, 0.98) if not wrong else rng.uniform(0.25, 0.75)
+    return "".join(chars), round(confidence, 3)
+
+
+def simulate(policy, args, seed=11):
+    rng = random.Random(seed)
+    voter = CaptchaVoter(CaptchaConstraints(CHARSET, 6, 6), threshold=args.threshold, max_refreshes=args.max_refreshes)
+    stats = CaptchaStats()
+    seconds = manual = 0
+    for _ in range(args.captchas):
+        submits = 0
+        while True:
+            # one search: read CAPTCHAs until one is worth submitting, then submit it
+            for refresh in range(voter.max_refreshes + 1 if policy != "single" else 1):
+                if refresh:
+                    stats.record_refresh()
+                    seconds += args.refresh
+                answer = "".join(rng.choices(CHARSET, k=6))
+                audio = _read(rng, answer, args.audio_error)
+                if policy == "single":
+                    best = Candidate(audio[0], audio[1], ["audio"]) if audio[1] >= args.threshold else None
+                else:
+                    readings = [("audio", *audio)]
+                    if policy == "vote+ocr":
+                        readings.append(("ocr", *_read(rng, answer, args.ocr_error)))
+                    best = voter.pick(rank_candidates(readings, voter.constraints, voter.weights))
+                if best is not None:
+                    break
+            if best is None:
+                manual += 1
+                seconds += args.manual
+                best = Candidate(answer, 1.0, ["manual"])
+            submits += 1
+            accepted = best.text == answer
+            stats.record(best, accepted)
+            if accepted:
+                break
+            seconds += args.reload
+        stats.record_job(submits)
+    return stats.summary(), seconds, manual
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CAPTCHA submits per job with and without voting")
+    parser.add_argument("--captchas", type=int, default=5000)
+    parser.add_argument("--audio-error", type=float, default=0.08, help="per-character error of the audio reading")
+    parser.add_argument("--ocr-error", type=float, default=0.12, help="per-character error of the OCR reading")
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--max-refreshes", type=int, default=2)
+    parser.add_argument("--reload", type=float, default=4.0, help="seconds lost per wrong submit")
+    parser.add_argument("--refresh", type=float, default=0.7, help="seconds per CAPTCHA refresh")
+    parser.add_argument("--manual", type=float, default=8.0, help="seconds per operator answer")
+    args = parser.parse_args()
+
+    print(f"{'policy':<9} {'submits/job':>11} {'acceptance':>10} {'refreshes':>9} {'manual':>6} {'s/job':>6}")
+    for policy in ("single", "vote", "vote+ocr"):
+        summary, seconds, manual = simulate(policy, args)
+        print(f"{policy:<9} {summary['submits_per_job']:>11} {summary['acceptance']:>10} "
+              f"{summary['refreshes']:>9} {manual:>6} {seconds / args.captchas:>6.2f}")
+        print(f"          by score: {summary['by_score']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# Order PDF download throughput against the local fixture site.
+#
+#   python -m benchmarks.bench_downloads --orders 200 --latency 0.05 --pdf-size 200000
+#
+# Times the same set of links three ways: one plain requests.get after another (the naive
+# loop), OrderDownloader with a single worker, and OrderDownloader with --workers threads.
+# A second pass over the pooled run checks that already-fetched files are skipped, and a
+# few links with an extra query string exercise the content-hash dedup.
+import argparse, os, shutil, tempfile, time
+
+import requests
+
+from app.order_downloader import OrderDownloader, order_file_name
+from benchmarks.fixture_site import FixtureSite, FixtureSettings
+
+
+def _links(site, count, duplicates):
+    links = [f"{site.base_url}/orders/bench-order-{i}.pdf" for i in range(count)]
+    return links + [f"{url}?copy=1" for url in links[:duplicates]]
+
+
+def run_naive(links):
+    out_dir = tempfile.mkdtemp(prefix="bench_dl_naive_")
+    start = time.perf_counter()
+    size = 0
+    for url in links:
+        body = requests.get(url, timeout=30).content
+        with open(os.path.join(out_dir, order_file_name(url)), "wb") as f:
+            f.write(body)
+        size += len(body)
+    elapsed = time.perf_counter() - start
+    shutil.rmtree(out_dir, ignore_errors=True)
+    return elapsed, size
+
+
+def run_downloader(links, workers, rate, passes=1):
+    out_dir = tempfile.mkdtemp(prefix="bench_dl_")
+    downloader = OrderDownloader(os.path.join(out_dir, "downloads.sqlite3"), workers=workers,
+                                 rate_per_host=rate)
+    try:
+        runs = [downloader.download_all((url, os.path.join(out_dir, "orders")) for url in links)
+                for _ in range(passes)]
+    finally:
+        downloader.close()
+    size = sum(os.path.getsize(os.path.join(out_dir, "orders", name))
+               for name in os.listdir(os.path.join(out_dir, "orders")))
+    shutil.rmtree(out_dir, ignore_errors=True)
+    return runs, size
+
+
+def _report(label, files, elapsed, size):
+    print(f"{label:<22}{files:>6} file(s) in {elapsed:6.2f}s -> {files / elapsed:8.1f} files/s, "
+          f"{size / elapsed / 1e6:6.2f} MB/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Order PDF download throughput against the fixture site")
+    parser.add_argument("--orders", type=int, default=100)
+    parser.add_argument("--duplicates", type=int, default=10, help="links that repeat an order under another URL")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=0, help="requests/second per host, 0 = unlimited")
+    parser.add_argument("--latency", type=float, default=0.05, help="fixture latency per response")
+    parser.add_argument("--pdf-size", type=int, default=100_000, help="bytes per PDF")
+    parser.add_argument("--skip-naive", action="store_true")
+    args = parser.parse_args()
+
+    site = FixtureSite(FixtureSettings(latency=args.latency, pdf_size=args.pdf_size)).start()
+    try:
+        links = _links(site, args.orders, args.duplicates)
+        if not args.skip_naive:
+            elapsed, size = run_naive(links)
+            _report("naive loop", len(links), elapsed, size)
+
+        (single,), size = run_downloader(links, 1, args.rate)
+        _report("downloader x1", len(links), single["seconds"], size)
+
+        (first, second), size = run_downloader(links, args.workers, args.rate, passes=2)
+        _report(f"downloader x{args.workers}", len(links), first["seconds"], size)
+        print(f"first pass: {first}")
+        print(f"second pass: {second}")
+        print(f"fixture: {site.stats}")
+    finally:
+        site.stop()
+
+
+if __name__ == "__main__":
+    main()
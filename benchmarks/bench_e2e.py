@@ -0,0 +1,159 @@
+# End-to-end throughput against the local fixture site (no itat.gov.in, no operator).
+#
+#   python -m benchmarks.bench_e2e --workers 2 --appeals 1..6 --latency 0.1
+#   python -m benchmarks.bench_e2e --scraper-only --pages 10 --pagination http
+#   python -m benchmarks.bench_e2e --runs 3
+#   python -m benchmarks.bench_e2e --runs 2 --daemon
+#
+# The full run drives main.runner() through the BrowserPool and reports jobs/minute and
+# rows/second; with --runs it scrapes the same jobs again (--daemon: as daemon cycles, through
+# the ledger) and checks the dataset keeps the same rows with no order link twice.
+# --scraper-only times TribunalWebScraper.iter_result_pages on one search.
+import argparse, copy, os, tempfile, time
+
+import main
+from app.constant import CONFIG
+from app.http_pager import session_from_driver
+from app.planner import plan_jobs
+from app.sinks import build_sink, load_dataset
+from app.job_ledger import JobLedger
+from app.worker_pool import BrowserPool
+from app.browser import build_driver
+from app.web_scraper import TribunalWebScraper
+from benchmarks.fixture_site import FixtureSite, FixtureSettings
+
+
+class EchoSolver:
+    # the fixture's "audio" is the answer itself
+    def solve(self, audio_bytes, timeout=None):
+        return audio_bytes.decode("ascii", "ignore").strip(), 1.0
+
+    def alive(self):
+        return True
+
+
+def _bench_cfg(args, site):
+    cfg = copy.deepcopy(CONFIG)
+    cfg.update(
+        url=site.url,
+        workers=args.workers,
+        benches=[args.bench],
+        appeals=[args.appeals],
+        dates=[args.date],
+        captcha={"min_confidence": 0.5},
+        pagination={"mode": args.pagination, "concurrency": 4},
+    )
+    cfg.setdefault("browser", {}).update(headless=not args.show, profile=args.profile)
+    return cfg
+
+
+def _dataset_rows(out_dir):
+    dataset = load_dataset(os.path.join(out_dir, "dataset"))
+    duplicates = dataset["Order Link"].duplicated().sum()
+    assert not duplicates, f"{duplicates} duplicate order link(s) in {out_dir}"
+    return len(dataset)
+
+
+def run_pool(args, site):
+    cfg = _bench_cfg(args, site)
+    out_dir = tempfile.mkdtemp(prefix="bench_e2e_")
+    main.CAPTCHA_SOLVER = EchoSolver()
+    main.SINK = build_sink(out_dir, "csv")
+    main.DELTA_SINK = build_sink(out_dir, "csv", delta=True)
+    main.ORDER_INDEX = None
+    main.LEDGER = JobLedger(os.path.join(out_dir, "jobs.sqlite3")) if args.daemon else None
+
+    jobs = plan_jobs(cfg)
+    pool = BrowserPool(cfg, ledger=main.LEDGER)
+    if args.daemon:
+        # warm browsers; every run is one daemon cycle that re-scrapes --date as a refresh date
+        pool.start(main.runner)
+    dataset_rows = []
+    try:
+        for run in range(args.runs):
+            start = time.perf_counter()
+            if args.daemon:
+                results = pool.submit(*main.schedule_jobs(cfg, refresh_dates=[args.date]))
+            else:
+                results = pool.run(jobs, main.runner)
+            elapsed = time.perf_counter() - start
+
+            rows = sum(r.get("rows", 0) for r in results)
+            statuses = {}
+            for r in results:
+                statuses[r.get("status")] = statuses.get(r.get("status"), 0) + 1
+            print(f"{len(jobs)} job(s) on {cfg['workers']} worker(s) in {elapsed:.1f}s -> "
+                  f"{len(jobs) / elapsed * 60:.1f} jobs/min, {rows / elapsed:.1f} rows/s")
+            print(f"statuses: {statuses} | fixture: {site.stats} | output: {out_dir}")
+            dataset_rows.append(_dataset_rows(out_dir))
+    finally:
+        pool.stop()
+        if main.LEDGER is not None:
+            main.LEDGER.close()
+    # the same jobs scraped again replace their partitions, they never add a second copy
+    assert len(set(dataset_rows)) == 1, f"dataset rows per run: {dataset_rows}"
+
+
+def run_scraper_only(args, site):
+    cfg = _bench_cfg(args, site)
+    bench, appeal, order_date = plan_jobs(cfg)[0]
+    driver = build_driver(cfg, profile_name="bench-e2e")
+    try:
+        scraper = TribunalWebScraper(driver)
+        driver.get(cfg["url"])
+        scraper.open_search_panel()
+        bench_name, appeal_name, _ = scraper.set_search_options(bench, appeal, order_date)
+
+        session = session_from_driver(driver, pool_size=1)
+        scraper.submit_captcha(session.get(f"{site.base_url}/_fixture/answer").text)
+        outcome, _ = scraper.wait_for_alert_or_results()
+        if outcome != "results":
+            raise SystemExit(f"Search did not return results ({outcome}).")
+
+        start = time.perf_counter()
+        pages = list(scraper.iter_result_pages(bench_name, appeal_name, cfg["pagination"]))
+        elapsed = time.perf_counter() - start
+        rows = sum(len(p.rows) for p in pages)
+        print(f"{args.pagination} pagination: {len(pages)} page(s), {rows} row(s) in {elapsed:.2f}s "
+              f"-> {rows / elapsed:.1f} rows/s")
+    finally:
+        driver.quit()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="End-to-end benchmark against the local fixture site")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--bench", default="20")
+    parser.add_argument("--appeals", default="1..6", help="appeal spec, e.g. 1..18")
+    parser.add_argument("--date", default="29/09/2025")
+    parser.add_argument("--latency", type=float, default=0.05, help="fixture latency per response")
+    parser.add_argument("--pages", type=int, default=3, help="max result pages per search")
+    parser.add_argument("--rows-per-page", type=int, default=10)
+    parser.add_argument("--empty-ratio", type=float, default=0.5)
+    parser.add_argument("--pagination", choices=["browser", "http"], default="browser")
+    parser.add_argument("--profile", choices=["default", "lean"], default="default")
+    parser.add_argument("--runs", type=int, default=1, help="scrape the same jobs this many times")
+    parser.add_argument("--daemon", action="store_true",
+                        help="run them as daemon cycles: warm pool, ledger, --date as a refresh date")
+    parser.add_argument("--scraper-only", action="store_true")
+    parser.add_argument("--show", action="store_true", help="run Chrome with a window")
+    args = parser.parse_args()
+    # main only configures logging when run as the CLI
+    main.set_global_logger(main.setup_logger("law_scraper", log_dir=main.constant.get_log_dir()))
+
+    settings = FixtureSettings(args.latency, args.pages, args.rows_per_page, args.empty_ratio)
+    if args.scraper_only:
+        # make sure the one search we time actually has every page
+        settings.empty_ratio, settings.exact_pages = 0.0, True
+    site = FixtureSite(settings).start()
+    try:
+        if args.scraper_only:
+            run_scraper_only(args, site)
+        else:
+            run_pool(args, site)
+    finally:
+        site.stop()
+
+
+if __name__ == "__main__":
+    main_cli()
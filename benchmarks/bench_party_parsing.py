@@ -0,0 +1,83 @@
+# Party parsing: one Helper call per row vs Helper.enrich_parties on whole columns.
+#
+#   python -m benchmarks.bench_party_parsing --rows 1000000
+#
+# The per-row baseline does what a row loop over the Parties column would do with the
+# string-pattern re.* calls the normalisers used to make; both paths produce the same columns.
+import argparse, random, re, time
+
+import pandas as pd
+
+from app.utils import Helper, REVENUE_PARTY, PARTY_SPLIT
+
+ASSESSEES = ["N SATISH EXPORTS PVT. LTD.", "M/S. AVANA GLOBAL FZCO", "SHRI PIYUSH ARUN BONGIRWAR",
+             "COLGATE PALMOLIVE (INDIA) LTD.", "DEZIRE EXPORTS", "VIRAJ PROFILES PVT LTD",
+             "CHANDRAPRABHA CO-OPERATIVE CREDIT SOCIETY LTD", "MORGAN STANLEY INDIA COMPANY PVT. LTD."]
+OFFICERS = ["DCIT, CENTRAL CIRCLE-3(2)", "ACIT-CC-5(2)", "ITO WARD 17(1)(4)", "PCIT - 5",
+            "DY. COMMISSIONER OF INCOME TAX, INTERNATIONAL TAX (IT) CIRCLE 3(2)(1)",
+            "INCOME TAX OFFICER 22(1)(6)", "ASST. COMMISSIONER OF INCOME TAX CENTRAL CIRCLE 5(4)"]
+CITIES = ["MUMBAI", "DELHI", "PUNE", "CHENNAI", "AHMEDABAD"]
+
+
+def synthetic_parties(rows, seed=7):
+    rng = random.Random(seed)
+    values = []
+    for _ in range(rows):
+        assessee = f"{rng.choice(ASSESSEES)} {rng.randint(1, 99999)},{rng.choice(CITIES)}"
+        officer = f"{rng.choice(OFFICERS)}, {rng.choice(CITIES)}"
+        values.append(f"{officer}\nVS.\n{assessee}" if rng.random() < 0.3 else f"{assessee}\nVS.\n{officer}")
+    return pd.DataFrame({"Parties": values})
+
+
+def _canonical_row(name):
+    name = re.sub(r"\s+", " ", name.upper()).strip()
+    name = re.sub(r"^(?:M/S\.?|MESSRS\.?|SHRI\.?|SMT\.?|MR\.?|MRS\.?|MS\.?)\s+", "", name)
+    name = re.sub(r"\s*,[^,]*$", "", name)
+    for pattern, replacement in (
+        (r"\bPVT\b\.?", "PRIVATE"), (r"\bLTD\b\.?", "LIMITED"), (r"\bCO\b\.(?=\s|$)", "CO"),
+        (r"\bDY\b\.?", "DEPUTY"), (r"\bASST\b\.?", "ASSISTANT"), (r"\bADDL\b\.?", "ADDITIONAL"),
+        (r"\bPR\b\.?", "PRINCIPAL"),
+    ):
+        name = re.sub(pattern, replacement, name)
+    return re.sub(r"\s+", " ", name).strip(" ,.-")
+
+
+def enrich_per_row(df):
+    records = []
+    for parties in df["Parties"]:
+        sides = re.split(PARTY_SPLIT.pattern, parties, maxsplit=1, flags=re.IGNORECASE) + [None]
+        record = {"Parties": parties}
+        for label, raw in (("Appellant", sides[0]), ("Respondent", sides[1])):
+            name = _canonical_row(raw) if raw is not None else None
+            record[label] = name
+            record[f"{label} Key"] = Helper._normalize_alphanumeric(name)
+            record[f"{label} Is Revenue"] = bool(raw and re.search(REVENUE_PARTY.pattern, raw.upper()))
+        records.append(record)
+    return pd.DataFrame(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-row vs vectorised party parsing")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    df = synthetic_parties(args.rows)
+
+    start = time.perf_counter()
+    per_row = enrich_per_row(df)
+    row_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorised = Helper.enrich_parties(df)
+    column_time = time.perf_counter() - start
+
+    pd.testing.assert_frame_equal(per_row, vectorised[per_row.columns], check_dtype=False)
+    print(f"{args.rows} row(s): per-row {row_time:.2f}s ({args.rows / row_time:,.0f} rows/s), "
+          f"vectorised {column_time:.2f}s ({args.rows / column_time:,.0f} rows/s) -> "
+          f"{row_time / column_time:.1f}x")
+    print(f"revenue appellants: {int(vectorised['Appellant Is Revenue'].sum())}, "
+          f"revenue respondents: {int(vectorised['Respondent Is Revenue'].sum())}")
+
+
+if __name__ == "__main__":
+    main()
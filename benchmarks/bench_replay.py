@@ -0,0 +1,107 @@
+# Re-parsing past result pages: live re-fetch vs PageCache replay.
+#
+#   python -m benchmarks.bench_replay --benches 10 --appeals 6 --latency 0.1
+#
+# The live pass is the cheapest possible re-scrape: plain HTTP against the fixture site with the
+# CAPTCHA answer read from /_fixture/answer (a real re-scrape also needs a browser and a human or
+# the solver per search). Every page it fetches is recorded into a PageCache; the replay pass then
+# re-runs parse_result_rows over the cache into a CSV sink and must produce the same rows, twice,
+# with the Parties text the browser's innerText would give.
+import argparse, os, shutil, tempfile, time
+
+import requests
+from bs4 import BeautifulSoup
+
+from app.page_cache import PageCache
+from app.result_parser import parse_result_rows
+from app.sinks import build_sink, load_dataset
+from benchmarks.fixture_site import FixtureSite, FixtureSettings, PAGE_PATH, BENCHES, APPEALS
+
+ORDER_DATE = "01/10/2025"
+# what innerText makes of a fixture Parties cell
+PARTIES_TEXT = r"ASSESSEE \S+ LTD, [A-Z]+\nVS\.\nDCIT CIRCLE \d, [A-Z]+"
+
+
+def count_result_pages(html):
+    return len(BeautifulSoup(html, "lxml").select("input[name='btnPage']")) or 1
+
+
+def fetch_live(site, cache, benches, appeals):
+    session = requests.Session()
+    url = f"{site.base_url}{PAGE_PATH}"
+    stats = {"searches": 0, "pages": 0, "rows": 0, "bytes": 0}
+    for bench in range(1, benches + 1):
+        for appeal in range(1, appeals + 1):
+            form = {"bench": bench, "appeal": appeal, "date": ORDER_DATE}
+            session.get(url)
+            answer = session.get(f"{site.base_url}/_fixture/answer").text
+            response = session.post(url, data=dict(form, captcha=answer))
+            stats["searches"] += 1
+            page, pages = 1, count_result_pages(response.text)
+            while True:
+                rows = parse_result_rows(response.text, base_url=response.url)
+                if not rows:
+                    break
+                cache.put(BENCHES[bench], APPEALS[appeal], ORDER_DATE, page, response.text, response.url)
+                stats["pages"] += 1
+                stats["rows"] += len(rows)
+                stats["bytes"] += len(response.content)
+                page += 1
+                if page > pages:
+                    break
+                response = session.post(url, data=dict(form, btnPage=page))
+    session.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live re-fetch vs page-cache replay")
+    parser.add_argument("--benches", type=int, default=10)
+    parser.add_argument("--appeals", type=int, default=6)
+    parser.add_argument("--pages", type=int, default=5, help="max result pages per search")
+    parser.add_argument("--rows", type=int, default=50, help="rows per result page")
+    parser.add_argument("--latency", type=float, default=0.1, help="fixture latency per response")
+    parser.add_argument("--workers", type=int, default=None, help="replay parser processes")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="bench_replay_")
+    site = FixtureSite(FixtureSettings(latency=args.latency, pages=args.pages, rows_per_page=args.rows,
+                                       empty_ratio=0.2)).start()
+    cache = PageCache(os.path.join(root, "cache"), workers=args.workers)
+    try:
+        start = time.perf_counter()
+        live = fetch_live(site, cache, args.benches, args.appeals)
+        live_time = time.perf_counter() - start
+        cached = cache.stats()
+        print(f"live:   {live['searches']} search(es), {live['pages']} page(s), {live['rows']} row(s) "
+              f"in {live_time:.2f}s ({live['pages'] / live_time:,.1f} pages/s)")
+        print(f"cache:  {live['bytes'] / 1024 ** 2:.1f} MB of HTML stored as {cached['mb']} MB "
+              f"({cached['bodies']} bodies for {cached['pages']} pages)")
+
+        start = time.perf_counter()
+        replay = cache.replay(build_sink(os.path.join(root, "replay"), "csv"))
+        replay_time = time.perf_counter() - start
+        print(f"replay: {replay['pages']} page(s), {replay['rows']} row(s) in {replay_time:.2f}s "
+              f"({replay['pages'] / replay_time:,.1f} pages/s) -> {live_time / replay_time:.1f}x")
+        assert replay["rows"] == live["rows"], (replay, live)
+
+        # a second replay replaces the first, and Parties reads like innerText in the browser
+        # despite the fixture's inline tags and indentation
+        cache.replay(build_sink(os.path.join(root, "replay"), "csv"))
+        dataset = load_dataset(os.path.join(root, "replay", "dataset"))
+        assert len(dataset) == live["rows"], (len(dataset), live["rows"])
+        odd = dataset[~dataset["Parties"].str.fullmatch(PARTIES_TEXT)]
+        assert odd.empty, odd["Parties"].head().tolist()
+
+        # eviction: cap the cache at half its size and re-record one page
+        cache.max_bytes = int(cached["mb"] * 1024 ** 2 / 2)
+        cache.put(BENCHES[1], APPEALS[1], "02/10/2025", 1, "<div id='results'></div>")
+        print(f"evicted to {cache.stats()}")
+    finally:
+        cache.close()
+        site.stop()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# CLI startup cost per subcommand, from `python -X importtime`.
+#
+#   python -m benchmarks.bench_startup --runs 5
+#   python -m benchmarks.bench_startup --command=--help --command="query SMITH"
+#
+# Each command runs as a fresh `python -X importtime main.py ...` process. Reported: median wall
+# time, total import time (sum of the top-level cumulative column), the slowest top-level
+# imports, and which of the heavy libraries were loaded at all.
+import argparse, os, re, statistics, subprocess, sys, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("selenium", "pandas", "openpyxl", "numpy", "bs4", "lxml", "requests", "json5")
+DEFAULT_COMMANDS = ["--help", "plan", "query NOBODY", "export --help", "scrape --help"]
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def run(command):
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, "-X", "importtime", "main.py", *command.split()],
+                             cwd=ROOT, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    imports = []
+    for line in process.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            imports.append((match.group(4), int(match.group(2)), len(match.group(3)) // 2))
+    return elapsed, imports, process.returncode
+
+
+def main():
+    parser = argparse.ArgumentParser(description="python -X importtime over the CLI subcommands")
+    parser.add_argument("--command", action="append", help="arguments after main.py (repeatable)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="slowest top-level imports to list")
+    args = parser.parse_args()
+
+    for command in args.command or DEFAULT_COMMANDS:
+        walls, totals = [], []
+        for _ in range(args.runs):
+            elapsed, imports, code = run(command)
+            walls.append(elapsed)
+            top_level = [(name, cumulative) for name, cumulative, depth in imports if depth == 0]
+            totals.append(sum(cumulative for _, cumulative in top_level) / 1000)
+        heavy = sorted({name.split(".")[0] for name, _, _ in imports} & set(HEAVY))
+        slowest = sorted(top_level, key=lambda item: -item[1])[:args.top]
+        print(f"main.py {command:<16} exit {code} | wall {statistics.median(walls) * 1000:6.0f} ms | "
+              f"imports {statistics.median(totals):6.0f} ms | heavy: {', '.join(heavy) or '-'}")
+        print("    slowest: " + ", ".join(f"{name} {cumulative / 1000:.0f} ms" for name, cumulative in slowest))
+
+
+if __name__ == "__main__":
+    main()
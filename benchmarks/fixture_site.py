@@ -0,0 +1,306 @@
+# Local stand-in for https://itat.gov.in/judicial/tribunalorders.
+#
+#   python -m benchmarks.fixture_site --port 8700 --latency 0.2 --pages 3
+#
+# Serves the same element ids/selectors the scraper relies on: the #headingTwo accordion,
+# bench_name_2 / app_type_2 dropdowns, the readonly order_date input, captcha image + audio,
+# the wrong-captcha alert, btnPage pagination and the "No Records Found" row.
+#
+# The CAPTCHA "audio" is the answer as plain text, so a solver that echoes the audio bytes
+# back always passes; GET /_fixture/answer returns it too. Order links point at small PDFs
+# served under /orders/, which makes the site usable as a download target as well.
+import argparse, hashlib, html, random, secrets, string, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit, quote
+
+PAGE_PATH = "/judicial/tribunalorders"
+
+BENCHES = ["Select Bench", "Agra", "Ahmedabad", "Allahabad", "Amritsar", "Bangalore", "Chandigarh",
+           "Chennai", "Cochin", "Cuttack", "Dehradun", "Delhi", "Guwahati", "Hyderabad", "Indore",
+           "Jabalpur", "Jaipur", "Jodhpur", "Kolkata", "Lucknow", "Mumbai", "Nagpur", "Panaji",
+           "Patna", "Pune", "Raipur", "Rajkot", "Ranchi", "Surat", "Varanasi", "Visakhapatnam"]
+APPEALS = ["Select Appeal Type", "Income Tax Appeal", "Cross Objection", "Income Tax (Search & Seizure) Appeal",
+           "Income Tax (Transfer Pricing) Appeal", "Income Tax (International Taxation) Appeal",
+           "Wealth Tax Appeal", "Black Money Appeal", "Estate Duty Appeal", "Interest Tax Appeal",
+           "Gift Tax Appeal", "TDS Appeal", "Security Transaction Tax Appeal", "Expenditure Tax Appeal",
+           "Sur Tax Appeal", "High Court Decision", "Stay Application", "Miscellaneous Application",
+           "Reference Application"]
+
+# smallest valid-looking PDF body; the hash in the comment keeps every order unique
+PDF_TEMPLATE = "%PDF-1.4\n% {key}\n1 0 obj << /Type /Catalog >> endobj\ntrailer << /Root 1 0 R >>\n%%EOF\n"
+PNG_1PX = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000100e221bc330000000049454e44ae426082"
+)
+
+
+class FixtureSettings:
+    def __init__(self, latency=0.0, pages=3, rows_per_page=10, empty_ratio=0.5, captcha_length=6,
+                 pdf_size=0, exact_pages=False):
+        self.latency = latency
+        self.pages = pages
+        self.exact_pages = exact_pages
+        self.rows_per_page = rows_per_page
+        self.empty_ratio = empty_ratio
+        self.captcha_length = captcha_length
+        self.pdf_size = pdf_size
+
+
+def _seed(*parts) -> int:
+    return int(hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()[:8], 16)
+
+
+def _result_pages(settings, bench, appeal, order_date) -> int:
+    # deterministic per search, so reruns and benchmarks see the same data
+    rng = random.Random(_seed(bench, appeal, order_date))
+    if rng.random() < settings.empty_ratio:
+        return 0
+    return settings.pages if settings.exact_pages else rng.randint(1, settings.pages)
+
+
+class _Session:
+    def __init__(self, length):
+        self.length = length
+        self.captcha = ""
+        self.flash = None
+        self.search = None
+        self.new_captcha()
+
+    def new_captcha(self):
+        self.captcha = "".join(random.choices(string.ascii_uppercase + string.digits, k=self.length))
+
+
+class FixtureSite:
+    def __init__(self, settings=None, host="127.0.0.1", port=0):
+        self.settings = settings or FixtureSettings()
+        self.sessions = {}
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "searches": 0, "wrong_captcha": 0, "pdf": 0}
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}{PAGE_PATH}"
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="fixture-site", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def session(self, sid):
+        with self.lock:
+            if sid not in self.sessions:
+                self.sessions[sid] = _Session(self.settings.captcha_length)
+            return self.sessions[sid]
+
+    # ----------------------------
+    # HTML
+    # ----------------------------
+    def render(self, session, page_num=1):
+        search = session.search or {}
+        bench, appeal, order_date = search.get("bench", 0), search.get("appeal", 0), search.get("date", "")
+
+        def options(names, selected):
+            return "".join(
+                f'<option value="{i}"{" selected" if i == selected else ""}>{html.escape(n)}</option>'
+                for i, n in enumerate(names)
+            )
+
+        alert = ""
+        if session.flash:
+            alert = f"<script>alert({session.flash!r});</script>"
+            session.flash = None
+
+        results = ""
+        if session.search is not None:
+            results = self.render_results(bench, appeal, order_date, page_num)
+
+        return f"""<!DOCTYPE html>
+<html><head><title>Tribunal Orders</title></head>
+<body>
+<div class="accordion">
+  <div id="headingTwo"><button type="button"
+    onclick="var c = document.getElementById('collapseTwo');
+             c.style.display = c.style.display === 'none' ? 'block' : 'none';">Search by Bench</button></div>
+  <div id="collapseTwo" style="display:none">
+    <form id="searchForm" method="post" action="{PAGE_PATH}">
+      <select id="bench_name_2" name="bench">{options(BENCHES, bench)}</select>
+      <select id="app_type_2" name="appeal">{options(APPEALS, appeal)}</select>
+      <input id="order_date" name="date" readonly value="{html.escape(order_date)}">
+      <img src="/captcha/image.png?{secrets.token_hex(4)}" alt="Captcha Image">
+      <img src="/static/play.png" alt="Play Icon"
+           onclick="document.getElementById('captchaAudio').src = '/captcha/audio.mp3?' + Date.now();">
+      <img src="/static/refresh.png" alt="Refresh Icon" onclick="window.location.href = '{PAGE_PATH}?refresh=1';">
+      <audio id="captchaAudio" src=""></audio>
+      <input id="captcha" name="captcha" autocomplete="off">
+      <button id="b2" type="submit" name="action" value="search">Search</button>
+    </form>
+  </div>
+</div>
+<div id="results">{results}</div>
+{alert}
+</body></html>"""
+
+    def render_results(self, bench, appeal, order_date, page_num):
+        total_pages = _result_pages(self.settings, bench, appeal, order_date)
+        if total_pages == 0:
+            return '<table><tbody><tr><td colspan="5">No Records Found</td></tr></tbody></table>'
+
+        rows = []
+        for n in range(self.settings.rows_per_page):
+            key = f"{bench}-{appeal}-{order_date.replace('/', '')}-{page_num}-{n}"
+            link = f"/orders/{quote(key)}.pdf"
+            # inline markup and source line breaks inside the cell, as on the real site; innerText
+            # reads it as "ASSESSEE <key> LTD, <BENCH>\nVS.\nDCIT CIRCLE <n>, <BENCH>"
+            rows.append(
+                f"<tr><td>{n + 1}</td><td>\n  <b>ASSESSEE</b> {key} LTD,\n  {BENCHES[bench].upper()}<br>VS.<br>\n"
+                f"  DCIT <span>CIRCLE {n % 7 + 1}</span>, {BENCHES[bench].upper()}\n</td><td>{html.escape(order_date)}</td>"
+                f'<td><a href="{link}">Order</a></td><td>{APPEALS[appeal]}</td></tr>'
+            )
+        buttons = "".join(
+            f'<input type="submit" name="btnPage" value="{p}"{" disabled" if p == page_num else ""}>'
+            for p in range(1, total_pages + 1)
+        )
+        return (f'<table><thead><tr><th>#</th><th>Parties</th><th>Date</th><th>Order</th><th>Type</th></tr></thead>'
+                f'<tbody>{"".join(rows)}</tbody></table>'
+                f'<form method="post" action="{PAGE_PATH}">'
+                f'<input type="hidden" name="bench" value="{bench}"><input type="hidden" name="appeal" value="{appeal}">'
+                f'<input type="hidden" name="date" value="{html.escape(order_date)}">{buttons}</form>')
+
+    # ----------------------------
+    # HTTP
+    # ----------------------------
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _session(self):
+                # one id per request: reuse the cookie, or mint one that _send hands back
+                self.new_sid = True
+                self.sid = secrets.token_hex(8)
+                for part in self.headers.get("Cookie", "").split(";"):
+                    name, _, value = part.strip().partition("=")
+                    if name == "sid" and value:
+                        self.sid, self.new_sid = value, False
+                return site.session(self.sid)
+
+            def _send(self, status, body=b"", content_type="text/html; charset=utf-8", headers=None):
+                if site.settings.latency:
+                    time.sleep(site.settings.latency)
+                self.send_response(status)
+                if self.new_sid:
+                    self.send_header("Set-Cookie", f"sid={self.sid}; Path=/")
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                with site.lock:
+                    site.stats["requests"] += 1
+                path = urlsplit(self.path).path
+                session = self._session()
+
+                if path == PAGE_PATH:
+                    query = parse_qs(urlsplit(self.path).query)
+                    if "refresh" in query:
+                        session.new_captcha()
+                    page_num = int(query.get("page", ["1"])[0])
+                    self._send(200, site.render(session, page_num).encode())
+                elif path == "/captcha/image.png":
+                    self._send(200, PNG_1PX, "image/png")
+                elif path == "/captcha/audio.mp3":
+                    self._send(200, session.captcha.encode(), "audio/mpeg")
+                elif path == "/_fixture/answer":
+                    self._send(200, session.captcha.encode(), "text/plain")
+                elif path.startswith("/static/"):
+                    self._send(200, PNG_1PX, "image/png")
+                elif path.startswith("/orders/"):
+                    self._send_pdf(path)
+                else:
+                    self._send(404, b"not found", "text/plain")
+
+            def _send_pdf(self, path):
+                with site.lock:
+                    site.stats["pdf"] += 1
+                body = PDF_TEMPLATE.format(key=path).encode()
+                if site.settings.pdf_size > len(body):
+                    body += b"%" * (site.settings.pdf_size - len(body))
+                start = 0
+                range_header = self.headers.get("Range", "")
+                if range_header.startswith("bytes="):
+                    start = int(range_header[6:].split("-")[0] or 0)
+                if start:
+                    self._send(206, body[start:], "application/pdf",
+                               {"Content-Range": f"bytes {start}-{len(body) - 1}/{len(body)}", "Accept-Ranges": "bytes"})
+                else:
+                    self._send(200, body, "application/pdf", {"Accept-Ranges": "bytes"})
+
+            def do_POST(self):
+                with site.lock:
+                    site.stats["requests"] += 1
+                length = int(self.headers.get("Content-Length", 0))
+                form = {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode()).items()}
+                session = self._session()
+                search = {"bench": int(form.get("bench", 0)), "appeal": int(form.get("appeal", 0)),
+                          "date": form.get("date", "")}
+                page_num = 1
+
+                if "btnPage" in form:
+                    if session.search != search:
+                        session.flash = "Session expired. Please search again."
+                        session.search = None
+                    page_num = int(form["btnPage"])
+                elif form.get("captcha", "").strip().upper() != session.captcha:
+                    with site.lock:
+                        site.stats["wrong_captcha"] += 1
+                    session.flash = "Invalid Captcha"
+                    session.search = None
+                else:
+                    with site.lock:
+                        site.stats["searches"] += 1
+                    session.search = search
+                session.new_captcha()
+                # post/redirect/get, so driver.refresh() never re-posts the form
+                self._send(303, headers={"Location": f"{PAGE_PATH}?page={page_num}"})
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the ITAT tribunal orders page")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8700)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--pages", type=int, default=3, help="max result pages per search")
+    parser.add_argument("--rows-per-page", type=int, default=10)
+    parser.add_argument("--empty-ratio", type=float, default=0.5, help="share of searches with no records")
+    args = parser.parse_args()
+
+    settings = FixtureSettings(args.latency, args.pages, args.rows_per_page, args.empty_ratio)
+    site = FixtureSite(settings, args.host, args.port)
+    print(f"Serving {site.url}")
+    try:
+        site.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,106 +1,515 @@
-import time,logging, os #type:ignore
-from datetime import datetime
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By                # Locators (ID, CLASS_NAME, XPATH, etc.)
-from selenium.webdriver.support.ui import WebDriverWait       # Waits for elements to appear
-from selenium.webdriver.support import expected_conditions as EC  # Conditions like "visible", "clickable"
-from selenium.webdriver.support.ui import Select
-from selenium.common.exceptions import TimeoutException
-from selenium.webdriver.chrome.options import Options
-
-from app.constant import CONFIG, HEADING_BUTTON, LOG_DIR, OUTPUT_DIR
-from app.constant import AUDIO_PLAY_BUTTON
-from app.logger import setup_logger, set_global_logger
-from app.web_scraper import TribunalWebScraper
-from app.utils import Helper
-# from app.captcha_solver import recognize_audio
-
-
-logger = setup_logger("law_scraper",log_dir=LOG_DIR, log_level=logging.DEBUG)
-set_global_logger(logger)
-
-def runner(driver, bench_index, appeal_index, dateTake, cfg):
+import time,logging, os, socket, sys, threading, argparse #type:ignore
+
+from app import constant
+from app.constant import DEFAULT_WAIT_TIME, AUDIO_PLAY_BUTTON
+from app.logger import get_global_logger, setup_logger, set_global_logger, setup_timing, span, timing_summary, close_timing
+from app.captcha_voting import CaptchaVoter, CaptchaStats, Candidate
+from app.planner import plan_jobs, describe_plan, prioritize_jobs, yield_tier
+
+# Selenium, pandas, openpyxl and the rest of app/ are imported inside the subcommands that use
+# them, so `main.py --help`, `plan` and `query` start without them.
+logger = get_global_logger()
+
+# only one worker may own the terminal prompt at a time (used when no broker is running)
+_INPUT_LOCK = threading.Lock()
+# resident whisper process shared by all workers, started in __main__ when enabled
+CAPTCHA_SOLVER = None
+# queue of CAPTCHAs waiting for the operator, started in __main__
+CAPTCHA_BROKER = None
+# charset/length constraints and audio+OCR voting, built in __main__ (from cfg per call otherwise)
+CAPTCHA_VOTER = None
+# acceptance of submitted answers, logged at the end of a run
+CAPTCHA_STATS = CaptchaStats()
+# every order link seen in any run, opened in __main__
+ORDER_INDEX = None
+# where scraped rows (and the new-orders delta) are written, built in __main__
+SINK = None
+DELTA_SINK = None
+# job status and page checkpoints, opened in __main__
+LEDGER = None
+# raw result pages for --replay, opened in __main__ when page_cache.enabled
+PAGE_CACHE = None
+
+def _read_captcha(scraper, voter, captcha_cfg):
+    # ranked candidates for the CAPTCHA currently on the form
+    from app.captcha_solver import fetch_captcha_audio
+    audio = None
+    if CAPTCHA_SOLVER is not None and CAPTCHA_SOLVER.alive():
+        try:
+            audio_url = scraper.get_captcha_audio()
+            logger.info(f"Fetched audio url: {audio_url}")
+            audio = CAPTCHA_SOLVER.solve(fetch_captcha_audio(scraper.driver, audio_url,
+                                                             verify=captcha_cfg.get("verify_ssl", True)))
+            logger.info(f"Solver answer: {audio[0]} (confidence {audio[1]:.2f})")
+        except Exception as e:
+            logger.error(f"Automatic CAPTCHA solve failed: {e}")
+    image = scraper.get_captcha_image() if voter.ocr else None
+    return voter.candidates(audio, image)
+
+def solve_captcha(scraper, label, cfg):
+    # Returns the Candidate to submit. A CAPTCHA whose best candidate scores below the threshold
+    # is swapped for a fresh one (one click) instead of being submitted, since a wrong answer
+    # costs an alert and a full reload of the form.
+    captcha_cfg = cfg.get("captcha", {})
+    voter = CAPTCHA_VOTER or CaptchaVoter.from_config(captcha_cfg)
+    if (CAPTCHA_SOLVER is not None and CAPTCHA_SOLVER.alive()) or voter.ocr:
+        for refresh in range(voter.max_refreshes + 1):
+            if refresh:
+                CAPTCHA_STATS.record_refresh()
+                scraper.refresh_captcha()
+            candidates = _read_captcha(scraper, voter, captcha_cfg)
+            best = voter.pick(candidates)
+            logger.info(f"CAPTCHA candidates: {candidates[:3]}")
+            if best is not None:
+                return best
+        logger.info("Low confidence, falling back to manual entry.")
+
+    from selenium.webdriver.common.by import By
+    audio_btn = scraper.driver.find_element(By.XPATH, AUDIO_PLAY_BUTTON)
+    scraper.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", audio_btn)
+    if CAPTCHA_BROKER is not None:
+        # queue it and wait; the operator answers whichever browser is next in line
+        return Candidate(CAPTCHA_BROKER.submit(label, scraper.get_captcha_image()).result(), 1.0, ["manual"])
+    with _INPUT_LOCK:
+        return Candidate(input(f"[{threading.current_thread().name}] {label} - Enter the Captcha seen: "), 1.0, ["manual"])
+
+def _lease_lost(job):
+    # only a worker under --worker can lose a job: its coordinator lease lapsed and the job was
+    # handed to someone else
+    return LEDGER is not None and LEDGER.lease_lost(job)
+
+def runner(scraper, bench_index, appeal_index, dateTake, cfg):
+    from app.driver_supervisor import is_session_error
     MAX_ATTEMPTS = cfg.get("max_attempts", 5)
     success = False
     attempt = 0
+    submits = 0  # CAPTCHA answers actually sent; attempts also count reloads and failed steps
+    job = (bench_index, appeal_index, dateTake)
     
-    scraper = TribunalWebScraper(driver)
+    driver = scraper.driver
     logger.info(f"Running for {bench_index}; {appeal_index} dated {dateTake}.")
     
-    while attempt < MAX_ATTEMPTS and not success:
+    while attempt < MAX_ATTEMPTS and not success and not _lease_lost(job):
         if attempt == 0:
-            driver.get(cfg["url"])
+            if cfg.get("reuse_form", True) and scraper.form_present():
+                # same page as the previous job: keep the form, just get a fresh captcha
+                logger.info("Reusing the search form from the previous job.")
+                scraper.refresh_captcha()
+            else:
+                with span("page_load"):
+                    driver.get(cfg["url"])
         logger.info(f"Attempt: {attempt + 1}")
         attempt += 1
         try:
-            accordion_btn = scraper.wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, HEADING_BUTTON))
-            )
-            driver.execute_script("arguments[0].click();", accordion_btn)
+            scraper.open_search_panel()
 
             bench_name, appeal_name, date_used = scraper.set_search_options(
                 bench_index, appeal_index, dateTake
             )
 
-            # audio_url = scraper.get_captcha_audio()
-            # logger.info(f"Fetched audio url: {audio_url}")
-            # data = recognize_audio(scraper.driver, audio_url)
-            # logger.info("Submitting to captcha.")
-            audio_btn = driver.find_element(By.XPATH, AUDIO_PLAY_BUTTON)
-            driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", audio_btn)
-            data = input("Enter the Captcha seen: ")
-            scraper.submit_captcha(data)
+            with span("captcha", attempt=attempt):
+                candidate = solve_captcha(scraper, f"{bench_name} / {appeal_name} / {dateTake}", cfg)
+            logger.info("Submitting to captcha.")
+            scraper.submit_captcha(candidate.text)
+            submits += 1
 
-            try:
-                WebDriverWait(driver, 5).until(EC.alert_is_present())
-                alert = scraper.driver.switch_to.alert
+            outcome, alert = scraper.wait_for_alert_or_results(cfg.get("submit_timeout", DEFAULT_WAIT_TIME))
+            if outcome == "alert":
+                CAPTCHA_STATS.record(candidate, accepted=False)
                 logger.warning(f"Alert says: {alert.text}")
                 alert.accept()
                 logger.info("Refreshing website to get new captcha...")
-                scraper.driver.refresh()
+                with span("page_load", reason="wrong_captcha"):
+                    scraper.driver.refresh()
                 continue
-            except TimeoutException:
+            if outcome == "results":
+                CAPTCHA_STATS.record(candidate, accepted=True)
                 logger.info("No alert — CAPTCHA accepted!")
                 success = True
-                time.sleep(0.5)
                 break
+            logger.warning("Neither an alert nor results appeared after submit. Refreshing...")
+            scraper.driver.refresh()
         except Exception as e:
+            if is_session_error(e):
+                raise  # the browser is gone; the worker restarts it and requeues the job
             logger.error(f"Failed during attempt {attempt}: {e}")
             time.sleep(0.5)
 
+    CAPTCHA_STATS.record_job(submits)
+    result = {"status": "failed", "rows": 0, "attempts": attempt, "output_file": None}
+    if _lease_lost(job):
+        logger.warning(f"Lease on {job} was lost, another worker is redoing it.")
+        result["status"] = "lease_lost"
+        return result
     if success and scraper.check_results_loaded():
-        df = scraper.scrape_results(bench_name, appeal_name)
-        ref_date = datetime.strptime(dateTake, "%d/%m/%Y").strftime("%d%m%Y")
-        out_path = Helper.create_dir(OUTPUT_DIR,f"{ref_date}_DATA")
-        
-        if isinstance(df, pd.DataFrame) and not df.empty:
-            file_path = os.path.join(out_path,f"{bench_name}_{appeal_name}_{ref_date}.xlsx")
-            # with pd.ExcelWriter(out_path,mode='w') as writer:
-            #     df.to_excel(writer, index=False)
-            df.to_excel(file_path, index=False)
+        checkpoint = (LEDGER.get(job) if LEDGER is not None else None) or {}
+        start_page = checkpoint.get("last_page", 0) + 1
+        counts = {"rows": checkpoint.get("rows", 0) if start_page > 1 else 0, "new_rows": 0}
+        if start_page > 1:
+            logger.info(f"Resuming from page {start_page} ({counts['rows']} row(s) already saved).")
+
+        try:
+            pages = scraper.iter_result_pages(bench_name, appeal_name, cfg.get("pagination"), start_page,
+                                              capture_html=PAGE_CACHE is not None)
+            # a job that starts over replaces what an earlier run wrote instead of appending to it
+            replace = start_page == 1
+            # new orders held back from ORDER_INDEX until a buffered delta sink has written them
+            unindexed = []
+            for page in pages:
+                # every page goes to the sinks as soon as it is scraped, then gets checkpointed
+                counts["rows"] += len(page.rows)
+                with span("write", rows=len(page.rows)):
+                    if PAGE_CACHE is not None and page.html:
+                        PAGE_CACHE.put(bench_name, appeal_name, dateTake, page.page_num, page.html, page.url)
+                    if replace:
+                        SINK.reset_job(bench_name, appeal_name, dateTake)
+                        if ORDER_INDEX is not None and not DELTA_SINK.durable:
+                            # only drops rows an interrupted run left buffered; the delta file stays
+                            DELTA_SINK.reset_job(bench_name, appeal_name, dateTake)
+                        replace = False
+                    SINK.write_batch(page.rows, dateTake)
+                    if ORDER_INDEX is not None:
+                        if DELTA_SINK.durable:
+                            new_rows = ORDER_INDEX.add_new(page.rows, order_date=dateTake)
+                        else:
+                            new_rows = ORDER_INDEX.unseen(page.rows)
+                            unindexed += new_rows
+                        counts["new_rows"] += len(new_rows)
+                        DELTA_SINK.write_batch(new_rows, dateTake)
+                    if LEDGER is not None and SINK.durable:
+                        LEDGER.checkpoint(job, page.page_num, counts["rows"])
+                if _lease_lost(job):
+                    break  # checked before the next page is fetched
+        except Exception as e:
+            if is_session_error(e):
+                raise  # pages written so far are checkpointed, the requeued job resumes after them
+            if not _lease_lost(job):  # a lost lease also shows up as a refused push
+                logger.error(f"Scraping stopped early: {e}")
+                result.update(rows=counts["rows"], error=str(e))
+
+        if _lease_lost(job):
+            logger.warning(f"Lease on {job} was lost after {counts['rows']} row(s), another worker is redoing it.")
+            result.update(status="lease_lost", rows=counts["rows"])
+            return result
+
+        resumed = start_page > 1
+        if counts["rows"]:
+            with span("write_finish"):
+                file_path = SINK.finish_job(bench_name, appeal_name, dateTake, append=resumed)
             logger.info(f"Data saved at {file_path}.")
-        else:
+            result.update(rows=counts["rows"], output_file=file_path)
+            if "error" not in result:
+                result["status"] = "done"
+            if ORDER_INDEX is not None:
+                result["new_rows"] = counts["new_rows"]
+                logger.info(f"{counts['new_rows']} order(s) not seen in earlier runs.")
+                if counts["new_rows"]:
+                    # the delta always grows: a retry from page 1 only finds the orders the failed
+                    # run did not already report, so overwriting would drop those
+                    logger.info(f"Delta saved at {DELTA_SINK.finish_job(bench_name, appeal_name, dateTake, append=True)}.")
+                if unindexed:
+                    ORDER_INDEX.add_new(unindexed, order_date=dateTake)
+        elif "error" not in result:
             logger.info("No valid data to save or scraping failed.")
+            result["status"] = "empty"
     else:
         logger.warning("No results found or CAPTCHA failed after max attempts.")
+    return result
+
+def schedule_jobs(cfg, refresh_dates=()):
+    # Planned jobs in yield order, minus the ones the ledger already finished. Jobs on
+    # refresh_dates run again anyway (the daemon re-scrapes recent dates for late uploads); they
+    # start at page 1, so runner() replaces their rows in the dataset rather than adding to them.
+    yield_cfg = cfg.get("yield", {})
+    yield_stats = LEDGER.yield_stats()
+    jobs, skipped = prioritize_jobs(plan_jobs(cfg), yield_stats, yield_cfg)
+    if skipped:
+        logger.info(f"Skipping {len(skipped)} low-yield job(s): {skipped}")
+    if cfg.get("resume", True):
+        remaining = set(LEDGER.unfinished(jobs))
+        logger.info(f"Resuming: {len(jobs) - len(remaining)} of {len(jobs)} job(s) already finished.")
+        jobs = [job for job in jobs if job in remaining or job[2] in refresh_dates]
+    else:
+        LEDGER.register(jobs)
+    tier = None if yield_cfg.get("full_sweep") else (lambda job: yield_tier(yield_stats, job, yield_cfg))
+    return jobs, tier
+
+
+# ----------------------------
+# Subcommands
+# ----------------------------
+def cmd_plan(args, cfg, output_dir):
+    # a dry run: reads the ledger's yield history when there is one, creates nothing
+    from app.job_ledger import JobLedger
+    ledger_path = os.path.join(output_dir, "jobs.sqlite3")
+    ledger = JobLedger(ledger_path, readonly=True) if os.path.exists(ledger_path) else None
+    try:
+        yield_stats = ledger.yield_stats() if ledger is not None else {}
+        jobs, _ = prioritize_jobs(plan_jobs(cfg), yield_stats, cfg.get("yield"))
+        print(describe_plan(jobs, cfg, yield_stats))
+    finally:
+        if ledger is not None:
+            ledger.close()
+
+def cmd_export(args, cfg, output_dir):
+    from app.sinks import export_excel
+    export_excel(os.path.join(output_dir, "dataset"), output_dir, args.date, args.bench,
+                 enrich=cfg.get("enrich_parties", False))
+
+def cmd_download(args, cfg, output_dir):
+    from app.sinks import load_dataset
+    from app.order_downloader import OrderDownloader, orders_dir
+    links = load_dataset(os.path.join(output_dir, "dataset"), args.date, args.bench)["Order Link"]
+    downloader = OrderDownloader.from_config(output_dir, cfg.get("downloads"))
+    try:
+        downloader.download_all((url, orders_dir(output_dir, args.date)) for url in links.dropna())
+    finally:
+        downloader.close()
+
+def cmd_index(args, cfg, output_dir):
+    from app.sinks import load_dataset
+    from app.order_downloader import OrderDownloader
+    from app.fulltext_index import OrderTextIndex, documents_from_dataset
+    text_index = OrderTextIndex(os.path.join(output_dir, "fulltext.sqlite3"),
+                                workers=cfg.get("fulltext", {}).get("workers"))
+    downloader = OrderDownloader.from_config(output_dir, cfg.get("downloads"))
+    try:
+        dataset = load_dataset(os.path.join(output_dir, "dataset"), args.date, args.bench)
+        text_index.update(documents_from_dataset(dataset, downloader))
+    finally:
+        downloader.close()
+        text_index.close()
+
+def cmd_search(args, cfg, output_dir):
+    from app.fulltext_index import OrderTextIndex
+    text_index = OrderTextIndex(os.path.join(output_dir, "fulltext.sqlite3"))
+    try:
+        for hit in text_index.search(args.text):
+            print(f"{hit['order_date']} | {hit['bench']} | {hit['appeal']} | {hit['parties']}\n"
+                  f"    {hit['path']}\n    {hit['snippet']}")
+    finally:
+        text_index.close()
+
+def sync_party_index(output_dir):
+    # scrape brings the party index up to date when it finishes, so query only looks up
+    from app.party_index import PartyIndex
+    party_index = PartyIndex(os.path.join(output_dir, "parties.sqlite3"))
+    try:
+        party_index.sync(output_dir)
+    finally:
+        party_index.close()
+
+def cmd_query(args, cfg, output_dir):
+    from app.party_index import PartyIndex
+    db_path = os.path.join(output_dir, "parties.sqlite3")
+    if args.sync or not os.path.exists(db_path):
+        sync_party_index(output_dir)
+    party_index = PartyIndex(db_path)
+    try:
+        hits = party_index.search(args.name, args.match)
+        for hit in hits:
+            print(f"{hit['order_date']} | {hit['bench']} | {hit['appeal']} | {hit['side']}\n"
+                  f"    {' VS. '.join(hit['parties'].splitlines()[::2])}\n    {hit['url']}")
+        print(f"{len(hits)} order(s).")
+    finally:
+        party_index.close()
+
+def cmd_replay(args, cfg, output_dir):
+    from app.page_cache import PageCache
+    from app.sinks import build_sink
+    cache = PageCache.from_config(output_dir, cfg.get("page_cache", {}))
+    replay_dir = os.path.join(output_dir, "replay")
+    sink = build_sink(replay_dir, cfg.get("sink", "csv"))
+    try:
+        start = time.perf_counter()
+        stats = cache.replay(sink, args.date, args.bench)
+        elapsed = time.perf_counter() - start
+        logger.info(f"Replayed {stats['pages']} page(s), {stats['rows']} row(s) in {elapsed:.1f}s "
+                    f"({stats['missing']} missing) into {replay_dir}.")
+    finally:
+        sink.close()
+        cache.close()
+
+def run_cycle(pool, cfg, refresh, output_dir):
+    # one daemon cycle on the warm browsers; the party index follows each cycle's rows
+    results = pool.submit(*schedule_jobs(cfg, refresh))
+    sync_party_index(output_dir)
+    return results
+
+def cmd_scrape(args, cfg, output_dir):
+    global CAPTCHA_SOLVER, CAPTCHA_BROKER, CAPTCHA_VOTER, ORDER_INDEX, SINK, DELTA_SINK, LEDGER, PAGE_CACHE
+    from app.worker_pool import BrowserPool
+    from app.captcha_solver import CaptchaSolverService
+    from app.captcha_broker import CaptchaBroker
+    from app.job_ledger import JobLedger
+    from app.order_index import OrderIndex
+    from app.sinks import build_sink
+    from app.daemon import ScrapeDaemon
+    from app.coordinator import Coordinator, CoordinatorClient, RemoteJobQueue, RemoteLedger, RemoteSink
+    from app.page_cache import PageCache
+
+    if args.worker:
+        # rows, checkpoints and results go to the coordinator instead of local files
+        coordinator_cfg = cfg.get("coordinator", {})
+        client = CoordinatorClient(args.worker, coordinator_cfg.get("worker_id") or socket.gethostname(),
+                                   poll_interval=coordinator_cfg.get("poll_interval", 5.0))
+        SINK = RemoteSink()
+        LEDGER = RemoteLedger(client, SINK)
+    else:
+        LEDGER = JobLedger(os.path.join(output_dir, "jobs.sqlite3"))
+        sink_format = cfg.get("sink", "csv")
+        SINK = build_sink(output_dir, sink_format)
+        DELTA_SINK = build_sink(output_dir, sink_format, delta=True)
+
+        if cfg.get("order_index", True):
+            ORDER_INDEX = OrderIndex(os.path.join(output_dir, "orders.sqlite3"))
+
+    if args.coordinator:
+        coordinator_cfg = cfg.get("coordinator", {})
+        coordinator = Coordinator(schedule_jobs(cfg)[0], LEDGER, SINK, DELTA_SINK, ORDER_INDEX,
+                                  ttl=coordinator_cfg.get("lease_ttl", 120),
+                                  max_attempts=coordinator_cfg.get("max_attempts", 3))
+        coordinator.serve(coordinator_cfg.get("host", "127.0.0.1"), coordinator_cfg.get("port", 8770))
+        try:
+            while not coordinator.finished.wait(1):
+                pass
+            logger.info("Every job is finished.")
+            sync_party_index(output_dir)
+        except KeyboardInterrupt:
+            logger.info("Coordinator stopped.")
+        finally:
+            coordinator.stop(grace=coordinator_cfg.get("shutdown_grace", 2 * coordinator_cfg.get("poll_interval", 5.0)))
+            logger.info(f"Ledger: {LEDGER.status_counts()}")
+            LEDGER.close()
+            if ORDER_INDEX is not None:
+                ORDER_INDEX.close()
+        return
+
+    if cfg.get("page_cache", {}).get("enabled", False):
+        PAGE_CACHE = PageCache.from_config(output_dir, cfg["page_cache"])
+
+    CAPTCHA_VOTER = CaptchaVoter.from_config(cfg.get("captcha"))
+    CAPTCHA_SOLVER = CaptchaSolverService.from_config(cfg.get("captcha"))
+    if CAPTCHA_SOLVER is not None:
+        CAPTCHA_SOLVER.start()
+
+    setup_timing(constant.get_log_dir, enabled=cfg.get("timing", False))
+
+    CAPTCHA_BROKER = CaptchaBroker.from_config(cfg.get("captcha", {}).get("broker"))
+
+    pool = BrowserPool(cfg, ledger=LEDGER)
+    daemon = None
+    try:
+        if args.daemon:
+            daemon_cfg = cfg.get("daemon", {})
+            pool.start(runner)
+            daemon = ScrapeDaemon(
+                daemon_cfg,
+                lambda dates, refresh: run_cycle(pool, dict(cfg, dates=dates), refresh, output_dir),
+                last_finished=LEDGER.last_finished_date,
+                extra_status=lambda: {"browsers": pool.alive(), "ledger": LEDGER.status_counts(),
+                                      "captcha": CAPTCHA_STATS.summary()},
+            )
+            if daemon_cfg.get("health_port", 8766):
+                daemon.serve_health(daemon_cfg.get("health_host", "127.0.0.1"), daemon_cfg.get("health_port", 8766))
+            try:
+                daemon.run_forever()
+            except KeyboardInterrupt:
+                logger.info("Daemon stopped.")
+        elif args.worker:
+            pool.run_queue(RemoteJobQueue(client), runner)
+        else:
+            jobs, tier = schedule_jobs(cfg)
+            pool.run(jobs, runner, tier=tier)
+            sync_party_index(output_dir)
+    finally:
+        if daemon is not None:
+            daemon.stop()
+        pool.stop()
+        logger.info(f"Ledger: {LEDGER.status_counts()}")
+        LEDGER.close()
+        if cfg.get("timing", False):
+            logger.info(f"Timing summary:\n{timing_summary()}")
+            close_timing()
+        if ORDER_INDEX is not None:
+            ORDER_INDEX.close()
+        if PAGE_CACHE is not None:
+            logger.info(f"Page cache: {PAGE_CACHE.stats()}")
+            PAGE_CACHE.close()
+        logger.info(f"CAPTCHA: {CAPTCHA_STATS.summary()}")
+        CAPTCHA_BROKER.stop()
+        if CAPTCHA_SOLVER is not None:
+            CAPTCHA_SOLVER.stop()
+    logger.info("All drivers have been quit.")
+
+# ----------------------------
+# Command line
+# ----------------------------
+def build_parser():
+    from app.party_index import MATCH_MODES
+    parser = argparse.ArgumentParser(description="ITAT tribunal orders scraper. With no subcommand, runs scrape.")
+    parser.add_argument("--config", metavar="PATH", help="configs.json5 to use instead of the one next to main.py")
+    # logs=False: the subcommand only prints, so it logs to the console and creates no log directory
+    parser.set_defaults(logs=True)
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+
+    scrape = commands.add_parser("scrape", help="run the configured jobs in the browser pool (the default)")
+    mode = scrape.add_mutually_exclusive_group()
+    mode.add_argument("--daemon", action="store_true",
+                      help="stay resident with warm browsers and scrape recent dates on the daemon schedule")
+    mode.add_argument("--coordinator", action="store_true",
+                      help="hand out the planned jobs to workers over HTTP and collect their rows")
+    mode.add_argument("--worker", metavar="URL",
+                      help="lease jobs from the coordinator at URL instead of planning them locally")
+    scrape.set_defaults(func=cmd_scrape)
+
+    plan = commands.add_parser("plan", help="print the expanded, ordered job schedule without scraping")
+    plan.set_defaults(func=cmd_plan, logs=False)
+
+    export = commands.add_parser("export", help="write one consolidated xlsx for a date from the dataset")
+    export.add_argument("date", metavar="DD/MM/YYYY")
+    export.add_argument("--bench", help="limit to one bench name")
+    export.set_defaults(func=cmd_export)
+
+    query = commands.add_parser("query", help="list orders involving a party")
+    query.add_argument("name", metavar="NAME")
+    query.add_argument("--match", choices=MATCH_MODES, default="exact", help="how NAME is matched")
+    query.add_argument("--sync", action="store_true",
+                       help="index dataset files written since the last scrape (e.g. copied in by hand) first")
+    query.set_defaults(func=cmd_query)
+
+    download = commands.add_parser("download", help="fetch the order PDFs listed in the dataset for a date")
+    download.add_argument("date", metavar="DD/MM/YYYY")
+    download.add_argument("--bench", help="limit to one bench name")
+    download.set_defaults(func=cmd_download)
+
+    index = commands.add_parser("index", help="add downloaded order PDFs to the full-text index")
+    index.add_argument("date", metavar="DD/MM/YYYY", nargs="?", help="one date (default: all)")
+    index.add_argument("--bench", help="limit to one bench name")
+    index.set_defaults(func=cmd_index)
+
+    search = commands.add_parser("search", help="full-text search over the indexed orders")
+    search.add_argument("text", metavar="QUERY")
+    search.set_defaults(func=cmd_search)
+
+    replay = commands.add_parser("replay", help="re-parse the cached result pages into output/replay")
+    replay.add_argument("date", metavar="DD/MM/YYYY", nargs="?", help="one date (default: all)")
+    replay.add_argument("--bench", help="limit to one bench name")
+    replay.set_defaults(func=cmd_replay)
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    argv = sys.argv[1:] if argv is None else list(argv)
+    args = parser.parse_args(argv)
+    if args.command is None:
+        args = parser.parse_args(argv + ["scrape"])
+
+    cfg = constant.load_config(args.config)
+    output_dir = constant.get_output_dir()
+    log_dir = constant.get_log_dir if args.logs else None
+    set_global_logger(setup_logger("law_scraper", log_dir=log_dir, log_level=logging.DEBUG, to_file=args.logs))
+    args.func(args, cfg, output_dir)
 
 if __name__ == "__main__":
-    options = Options()
-    if CONFIG["browser"].get("suppress_logs"):
-        options.add_argument("--log-level=3")
-    if CONFIG["browser"].get("headless"):
-        options.add_argument("--headless")
-
-    driver = webdriver.Chrome(options=options)
-    driver.get(CONFIG["url"])
-
-    for bench_name in CONFIG["benches"]:
-        for appeal_name in CONFIG["appeals"]:
-            for dateTake in CONFIG["dates"]:
-                logger.info("========== New Run ==========")
-                runner(driver, bench_name, appeal_name, dateTake, CONFIG)
-
-    driver.quit()
-    time.sleep(10)
-    logger.info("Driver has been quit.")
+    main()